@@ -8,4 +8,5 @@ from .savers import Savers
 from .splitters import Splitters
 from .utils import Utils
 from .main_settings import MainSettings, LocalizationSettings
-from .dataset_gen import DatasetGenerators
\ No newline at end of file
+from .dataset_gen import DatasetGenerators
+from .pipeline import Pipeline
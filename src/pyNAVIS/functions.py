@@ -19,78 +19,265 @@
 ##                                                                             ##
 #################################################################################
 
-import copy
-import random
 import time
+from fractions import Fraction
 
 import numpy as np
 
 # from .objects import LocalizationFile
 from .objects import SpikesFile
 from .savers import Savers
-from .utils import Utils
 
 
 class Functions:
 
 	@staticmethod
-	def check_SpikesFile(spikes_file, settings):
+	def _check_mode(mode, function_name):
+		"""
+		Checks that a validation mode is one of 'full', 'sample' or 'none'.
+
+		Parameters:
+				mode (string): Validation mode to check.
+				function_name (string): Name of the function that received the mode, used in the error message.
+
+		Returns:
+				None.
+
+		Raises:
+				ValueError: If mode is not 'full', 'sample' or 'none'.
+		"""
+		if mode not in ('full', 'sample', 'none'):
+			raise ValueError("[" + function_name + "] > ParametersError: mode must be 'full', 'sample' or 'none', not " + repr(mode) + ".")
+
+	@staticmethod
+	def _chunk_starts(num_events, chunk_size, mode, num_samples):
+		"""
+		Gets the first index of each chunk of events checked by a validation function.
+
+		Parameters:
+				num_events (int): Number of events of the file.
+				chunk_size (int): Number of events of each chunk.
+				mode (string): 'full' to get all the chunks of the file, or 'sample' to get only num_samples chunks evenly spread over the file.
+				num_samples (int): Number of chunks when mode is set to 'sample'.
+
+		Returns:
+				int[]: First index of each chunk, in increasing order.
+		"""
+		chunk_starts = range(0, num_events, chunk_size)
+		if mode == 'sample' and len(chunk_starts) > num_samples:
+			chunk_starts = np.unique(np.linspace(0, num_events - chunk_size, num_samples).astype(np.int64)).tolist()
+		return chunk_starts
+
+	@staticmethod
+	def validate_SpikesFile(spikes_file, settings, mode='full', chunk_size=1048576, num_samples=16):
+		"""
+		Looks for the first negative timestamp, the first timestamp that is lesser than its previous one and the first address out of range of a SpikesFile, checking the three conditions together in a single pass over the file.
+
+		Parameters:
+				spikes_file (SpikesFile): File to check.
+				settings (MainSettings): Configuration parameters for the file to check.
+				mode (string, optional): Set to 'full' to check every event, to 'sample' to check only num_samples chunks evenly spread over the file, or to 'none' to skip the checks.
+				chunk_size (int, optional): Number of events checked at once. Temporary arrays never exceed this size.
+				num_samples (int, optional): Number of chunks checked when mode is set to 'sample'.
+
+		Returns:
+				int: Index of the first negative timestamp, or None if there is none.
+				int: Index of the first timestamp that is lesser than its previous one, or None if there is none.
+				int: Index of the first address that is either less than 0 or greater than or equal to the number of addresses, or None if there is none.
+
+		Raises:
+				ValueError: If mode is not 'full', 'sample' or 'none'.
+
+		Notes:
+				The number of addresses is num_channels*(on_off_both + 1)*(mono_stereo + 1).
+		"""
+		first_negative = None
+		first_unordered = None
+		first_out_of_range = None
+
+		Functions._check_mode(mode, 'Functions.validate_SpikesFile')
+		if mode == 'none':
+			return first_negative, first_unordered, first_out_of_range
+
+		# Convert to numpy arrays
+		addresses = np.asarray(spikes_file.addresses)
+		timestamps = np.asarray(spikes_file.timestamps)
+		num_events = len(timestamps)
+
+		# Calculate maximum number of addresses
+		number_of_addresses = settings.num_channels * (settings.on_off_both + 1) * (settings.mono_stereo + 1)
+
+		# Unsigned arrays cannot contain negative values
+		check_negative_ts = timestamps.dtype.kind not in 'uO'
+		check_negative_addr = addresses.dtype.kind not in 'uO'
+
+		# Chunks to check
+		chunk_starts = Functions._chunk_starts(num_events, chunk_size, mode, num_samples)
+
+		for start in chunk_starts:
+			end = min(start + chunk_size, num_events)
+			chunk_ts = timestamps[start:end]
+			chunk_addr = addresses[start:end]
+
+			# Check if all timestamps are greater than zero
+			if first_negative is None and check_negative_ts:
+				negative = chunk_ts < 0
+				if negative.any():
+					first_negative = start + int(np.argmax(negative))
+
+			# Check if each timestamp is greater than its previous one (including the last one of the previous chunk)
+			if first_unordered is None:
+				previous = max(start - 1, 0)
+				order_ts = timestamps[previous:end]
+				unordered = order_ts[1:] < order_ts[:-1]
+				if unordered.any():
+					first_unordered = previous + 1 + int(np.argmax(unordered))
+
+			# Check if all addresses are between zero and the total number of addresses
+			if first_out_of_range is None:
+				out_of_range = chunk_addr >= number_of_addresses
+				if check_negative_addr:
+					out_of_range |= chunk_addr < 0
+				if out_of_range.any():
+					first_out_of_range = start + int(np.argmax(out_of_range))
+
+			if first_negative is not None and first_unordered is not None and first_out_of_range is not None:
+				break
+
+		return first_negative, first_unordered, first_out_of_range
+
+	@staticmethod
+	def check_SpikesFile(spikes_file, settings, mode='full'):
 		"""
         Checks if the spiking information contained in the SpikesFile is correct and prints "The loaded SpikesFile file has been checked and it's OK" if the file passes all the checks.
 
         Parameters:
                 spikes_file (SpikesFile): File to check.
                 settings (MainSettings): Configuration parameters for the file to check.
+                mode (string, optional): Set to 'full' to check every event, to 'sample' to check only a sample of the file, or to 'none' to skip the checks. See validate_SpikesFile.
 
         Returns:
-                None.
+                boolean: True if no timestamp is less than 0.
+                boolean: True if timestamps are in increasing order.
+                boolean: True if all addresses are in range.
 
         Raises:
                 TimestampOrderError: If the SpikesFile contains at least one timestamp which value is less than 0.
                 TimestampOrderError: If the SpikesFile contains at least one timestamp that is lesser than its previous one.
                 AddressValueError: If the SpikesFile contains at least one address less than 0 or greater than the num_channels that you specified in the MainSettings.
+                ValueError: If mode is not 'full', 'sample' or 'none'.
         Notes:
                 If mono_stereo is set to 1 (stereo) in the MainSettings, then  addresses should be less than num_channels*2.
 
                 If on_off_both is set to 1 (both) in the MainSettings, then addresses should be less than num_channels*2.
 
                 If mono_stereo is set to 1 and on_off_both is set to 1 in the MainSettings, then addresses should be less than num_channels*2*2.
+
+                The three checks are done in a single pass over the file (see validate_SpikesFile).
         """
-		# Convert to numpy arrays
-		addresses = np.array(spikes_file.addresses, copy=False)
-		timestamps = np.array(spikes_file.timestamps, copy=False)
+		first_negative, first_unordered, first_out_of_range = Functions.validate_SpikesFile(spikes_file, settings, mode=mode)
 
-		# Check if all timestamps are greater than zero
-		any_negative = np.any(timestamps < 0)
+		if first_negative is not None and settings.verbose:
+			print("[Functions.check_SpikesFile] > TimestampOrderError: The SpikesFile file that you loaded has at least one timestamp that is less than 0 (first at index " + str(first_negative) + ").")
 
-		if any_negative and settings.verbose:
-			print("[Functions.check_SpikesFile] > TimestampOrderError: The SpikesFile file that you loaded has at least one timestamp that is less than 0.")
+		if first_unordered is not None and settings.verbose:
+			print("[Functions.check_SpikesFile] > TimestampOrderError: The SpikesFile file that you loaded has at least one timestamp whose value is lesser than its previous one (first at index " + str(first_unordered) + ").")
 
-		# Check if each timestamp is greater than its previous one
-		increasing_order = np.all(timestamps[:-1] <= timestamps[1:])
+		if first_out_of_range is not None and settings.verbose:
+			print("[Functions.check_SpikesFile] > AddressValueError: The SpikesFile file that you loaded has at least one event whose address is either less than 0 or greater than the number of addresses that you specified (first at index " + str(first_out_of_range) + ").")
 
-		if (not increasing_order) and settings.verbose:
-			print("[Functions.check_SpikesFile] > TimestampOrderError: The SpikesFile file that you loaded has at least one timestamp whose value is lesser than its previous one.")
+		# Check if all is OK
+		all_ok = first_negative is None and first_unordered is None and first_out_of_range is None
 
-		# Calculate maximum number of addresses
-		number_of_addresses = settings.num_channels * (settings.on_off_both + 1) * (settings.mono_stereo + 1)
+		if all_ok and settings.verbose and mode != 'none':
+			print("[Functions.check_SpikesFile] > The loaded SpikesFile file has been checked and it's OK")
 
-		# Check if all addresses are between zero and the total number of addresses
-		all_in_range = np.all((addresses >= 0) & (addresses < number_of_addresses))
+		return first_negative is None, first_unordered is None, first_out_of_range is None
 
-		if (not all_in_range) and settings.verbose:
-			print("[Functions.check_SpikesFile] > AddressValueError: The SpikesFile file that you loaded has at least one event whose address is either less than 0 or greater than the number of addresses that you specified.")
+	@staticmethod
+	def validate_LocalizationFile(localization_file, localization_settings, mode='full', chunk_size=1048576, num_samples=16):
+		"""
+		Looks for the first negative timestamp, the first timestamp that is lesser than its previous one, the first channel out of range and the first neuron ID out of range of the MSO events of a LocalizationFile, checking the four conditions together in a single pass over the file.
 
-		# Check if all is OK
-		all_ok = not any_negative and increasing_order and all_in_range
+		Parameters:
+				localization_file (LocalizationFile): File to check.
+				localization_settings (LocalizationSettings): Configuration parameters of the localization model for the file to check.
+				mode (string, optional): Set to 'full' to check every event, to 'sample' to check only num_samples chunks evenly spread over the file, or to 'none' to skip the checks.
+				chunk_size (int, optional): Number of events checked at once. Temporary arrays never exceed this size.
+				num_samples (int, optional): Number of chunks checked when mode is set to 'sample'.
 
-		if all_ok and settings.verbose:
-			print("[Functions.check_SpikesFile] > The loaded SpikesFile file has been checked and it's OK")
+		Returns:
+				int: Index of the first negative timestamp, or None if there is none.
+				int: Index of the first timestamp that is lesser than its previous one, or None if there is none.
+				int: Index of the first channel that is either less than mso_start_channel or greater than mso_end_channel, or None if there is none.
+				int: Index of the first neuron ID that is either less than 0 or greater than or equal to mso_num_neurons_channel, or None if there is none.
+
+
+		Raises:
+				ValueError: If mode is not 'full', 'sample' or 'none'.
+		"""
+		first_negative = None
+		first_unordered = None
+		first_channel_out_of_range = None
+		first_neuron_out_of_range = None
 
-		return not any_negative, increasing_order, all_in_range
+		Functions._check_mode(mode, 'Functions.validate_LocalizationFile')
+		if mode == 'none':
+			return first_negative, first_unordered, first_channel_out_of_range, first_neuron_out_of_range
+
+		# Convert to numpy arrays
+		timestamps = np.asarray(localization_file.mso_timestamps)
+		channels = np.asarray(localization_file.mso_channels)
+		neuron_ids = np.asarray(localization_file.mso_neuron_ids)
+		num_events = len(timestamps)
+
+		# Unsigned arrays cannot contain negative values
+		check_negative_ts = timestamps.dtype.kind not in 'uO'
+		check_negative_ids = neuron_ids.dtype.kind not in 'uO'
+
+		# Chunks to check
+		chunk_starts = Functions._chunk_starts(num_events, chunk_size, mode, num_samples)
+
+		for start in chunk_starts:
+			end = min(start + chunk_size, num_events)
+
+			# Check if all timestamps are greater than zero
+			if first_negative is None and check_negative_ts:
+				negative = timestamps[start:end] < 0
+				if negative.any():
+					first_negative = start + int(np.argmax(negative))
+
+			# Check if each timestamp is greater than its previous one (including the last one of the previous chunk)
+			if first_unordered is None:
+				previous = max(start - 1, 0)
+				order_ts = timestamps[previous:end]
+				unordered = order_ts[1:] < order_ts[:-1]
+				if unordered.any():
+					first_unordered = previous + 1 + int(np.argmax(unordered))
+
+			# Check if all channel values are between mso_start_channel and mso_end_channel
+			if first_channel_out_of_range is None:
+				chunk_channels = channels[start:end]
+				out_of_range = (chunk_channels < localization_settings.mso_start_channel) | (chunk_channels > localization_settings.mso_end_channel)
+				if out_of_range.any():
+					first_channel_out_of_range = start + int(np.argmax(out_of_range))
+
+			# Check if all neuron IDs are between zero and the number of mso_num_neurons_channel
+			if first_neuron_out_of_range is None:
+				chunk_ids = neuron_ids[start:end]
+				out_of_range = chunk_ids >= localization_settings.mso_num_neurons_channel
+				if check_negative_ids:
+					out_of_range |= chunk_ids < 0
+				if out_of_range.any():
+					first_neuron_out_of_range = start + int(np.argmax(out_of_range))
+
+			if first_negative is not None and first_unordered is not None and first_channel_out_of_range is not None and first_neuron_out_of_range is not None:
+				break
+
+		return first_negative, first_unordered, first_channel_out_of_range, first_neuron_out_of_range
 
 	@staticmethod
-	def check_LocalizationFile(localization_file, settings, localization_settings):
+	def check_LocalizationFile(localization_file, settings, localization_settings, mode='full'):
 		"""
 		Checks if the spiking information contained in the LocalizationFile is correct and prints "The loaded LocalizationFile file has been checked and it's OK" if the file passes all the checks.
 		
@@ -98,6 +285,7 @@ class Functions:
 				localization_file (LocalizationFile): File to check.
 				settings (MainSettings): Configuration parameters for the file to check.
 				localization_settings (LocalizationSettings): Configuration parameters of the localization model for the file to check.
+				mode (string, optional): Set to 'full' to check every event, to 'sample' to check only a sample of the file, or to 'none' to skip the checks. See validate_LocalizationFile.
 
 		Returns:
 				None.
@@ -107,39 +295,97 @@ class Functions:
 				TimestampOrderError: If the LocalizationFile contains at least one timestamp that is lesser than its previous one.
 				ChannelValueError: If the LocalizationFile contains at least one address less than mso_start_channel or greater than mso_end_channel that you specified in the LocalizationSettings.
 				NeuronIDValueError: If the LocalizationFile contains at least one address less than 0 or greater than the mso_num_neurons_channel you specified in LocalizationSettings
+				ValueError: If mode is not 'full', 'sample' or 'none'.
 		Notes:   
 				If mso_start_channel is set to 33 and mso_end_channel is set to 36, there will be four possible channel values: [33, 36]
+
+				The four checks are done in a single pass over the file (see validate_LocalizationFile).
 		"""
+		first_negative, first_unordered, first_channel_out_of_range, first_neuron_out_of_range = Functions.validate_LocalizationFile(localization_file, localization_settings, mode=mode)
+
+		if first_negative is not None:
+			print("[Functions.check_LocalizationFile] > TimestampOrderError: The LocalizationFile file that you loaded has at least one timestamp that is less than 0 (first at index " + str(first_negative) + ").")
+
+		if first_unordered is not None:
+			print("[Functions.check_LocalizationFile] > TimestampOrderError: The LocalizationFile file that you loaded has at least one timestamp whose value is lesser than its previous one (first at index " + str(first_unordered) + ").")
 
-		# Check if all timestamps are greater than zero
-		a = all(item >= 0  for item in localization_file.mso_timestamps)
+		if first_channel_out_of_range is not None:
+			print("[Functions.check_LocalizationFile] > ChannelValueError: The LocalizationFile file that you loaded has at least one event whose channel value is either less than mso_start_channel or greater than mso_end_channel (first at index " + str(first_channel_out_of_range) + ").")
 
-		if not a:
-			print("[Functions.check_LocalizationFile] > TimestampOrderError: The LocalizationFile file that you loaded has at least one timestamp that is less than 0.")
+		if first_neuron_out_of_range is not None:
+			print("[Functions.check_LocalizationFile] > NeuronIDValueError: The LocalizationFile file that you loaded has at least one event whose neuron ID value is either less than zero or greater than mso_num_neurons_channel (first at index " + str(first_neuron_out_of_range) + ").")
 
-		# Check if each timestamp is greater than its previous one
-		b = not any(i > 0 and localization_file.mso_timestamps[i] < localization_file.mso_timestamps[i-1] for i in range(len(localization_file.mso_timestamps)))
+		if first_negative is None and first_unordered is None and first_channel_out_of_range is None and first_neuron_out_of_range is None and mode != 'none':
+			print("[Functions.check_LocalizationFile] > The loaded LocalizationFile file has been checked and it's OK")
 
-		if not b:
-			print("[Functions.check_LocalizationFile] > TimestampOrderError: The LocalizationFile file that you loaded has at least one timestamp whose value is lesser than its previous one.")
+	@staticmethod
+	def _rescale_timestamps(timestamps, offset, ts_tick, chunk_size=1048576, inplace=False):
+		"""
+		Computes (timestamps - offset)*ts_tick, rounded down, using exact integer arithmetic.
 
-		# Check if all channel values are between mso_start_channel and mso_end_channel
-		c = all(item >= localization_settings.mso_start_channel and item <= localization_settings.mso_end_channel for item in localization_file.mso_channels)
+		Parameters:
+				timestamps (int[]): Timestamps to rescale.
+				offset (int): Value subtracted to all the timestamps.
+				ts_tick (float): Tick of the timestamps.
+				chunk_size (int, optional): Number of timestamps rescaled at once. Temporary arrays never exceed this size.
+				inplace (boolean, optional): Set to True to allow rescaling the input array in place. Only use it when no other object shares the input array.
 
-		if not c:
-			print("[Functions.check_LocalizationFile] > ChannelValueError: The LocalizationFile file that you loaded has at least one event whose channel value is either less than mso_start_channel or greater than mso_end_channel.")
+		Returns:
+				int[]: Rescaled timestamps, as a uint32 array if all of them fit in it, as a uint64 array if they are too large, or as an int64 array if any of them is negative. If inplace is True and the input array owns its data and has the same dtype as the result, the input array is rescaled in place and returned. Otherwise, a new array is allocated.
 
-		# Check if all neuron IDs are between zero and the number of mso_num_neurons_channel
-		d = all(item >= 0 and item < localization_settings.mso_num_neurons_channel for item in localization_file.mso_neuron_ids)
+		Note:
+				ts_tick is converted to the fraction written in its decimal representation (0.2 = 1/5, 80e-3 = 2/25), so that no precision is lost.
+				If the intermediate products do not fit in 64 bits (e.g. ts_tick = 1/3), float64 arithmetic is used instead.
+				float64 timestamps are rescaled with float64 arithmetic and returned as a new float64 array.
+		"""
+		tick = Fraction(str(ts_tick))
+		if timestamps.dtype.kind == 'f':
+			# Fractional timestamps are kept as float64, without rounding
+			return (timestamps - offset) * float(tick)
+
+		numerator = tick.numerator
+		denominator = tick.denominator
+		offset = int(offset)
+		min_value = int(timestamps.min()) - offset
+		max_value = int(timestamps.max()) - offset
+
+		# Signed arithmetic is only needed for negative timestamps or offsets
+		work_dtype = np.int64 if (min_value < 0 or offset < 0) else np.uint64
+		exact = max(abs(min_value), max_value) * numerator <= int(np.iinfo(work_dtype).max)
+
+		# Choose the output dtype by the range of the result
+		min_result = min_value * numerator // denominator
+		max_result = max_value * numerator // denominator
+		if min_result < 0:
+			out_dtype = np.int64
+		elif max_result <= np.iinfo(np.uint32).max:
+			out_dtype = np.uint32
+		else:
+			out_dtype = np.uint64
 
-		if not d:
-			print("[Functions.check_LocalizationFile] > NeuronIDValueError: The LocalizationFile file that you loaded has at least one event whose neuron ID value is either less than zero or greater than mso_num_neurons_channel.")
+		if inplace and timestamps.dtype == out_dtype and timestamps.base is None and timestamps.flags.writeable and not isinstance(timestamps, np.memmap):
+			result = timestamps
+		else:
+			result = np.empty(len(timestamps), dtype=out_dtype)
+
+		for start in range(0, len(timestamps), chunk_size):
+			end = min(start + chunk_size, len(timestamps))
+			if exact:
+				chunk = timestamps[start:end].astype(work_dtype)
+				chunk -= work_dtype(offset)
+				chunk *= work_dtype(numerator)
+				chunk //= work_dtype(denominator)
+			else:
+				chunk = timestamps[start:end].astype(np.float64)
+				chunk -= offset
+				chunk *= float(tick)
+				np.floor(chunk, out=chunk)
+			result[start:end] = chunk
 
-		if a and b and c and d:
-			print("[Functions.check_LocalizationFile] > The loaded LocalizationFile file has been checked and it's OK")
+		return result
 
 	@staticmethod
-	def adapt_timestamps(spikes_file, settings):
+	def adapt_timestamps(spikes_file, settings, chunk_size=1048576, inplace=False):
 		"""
 		Subtracts the smallest timestamp of the timestamps list to all of the timestamps contained in the list (in order to start from 0)
 		It also adapts timestamps based on the tick frequency (ts_tick in the MainSettings).
@@ -147,43 +393,332 @@ class Functions:
 		Parameters:
 		  		spikes_file:
 				settings (MainSettings): Configuration parameters for the file to adapt.
+				chunk_size (int, optional): Number of timestamps adapted at once. Temporary arrays never exceed this size.
+				inplace (boolean, optional): Set to True to rescale the timestamps array of the SpikesFile in place instead of allocating a new one. Only use it when no other object or variable refers to that array, since they would see the adapted timestamps too.
 
 		Returns:
 				adapted_timestamps:  Adapted timestamps list.
+
+		Note:
+				Timestamps are rescaled with exact integer arithmetic and stored as uint32, or as uint64 if the adapted timestamps do not fit in 32 bits (see _rescale_timestamps). Unless inplace is set to True, a new array is allocated and the previous timestamps array is not modified.
 		"""
 		if len(spikes_file.timestamps)>0:
 			# Convert to numpy array
-			timestamps = np.array(spikes_file.timestamps, copy=False)
-
-			if settings.reset_timestamp:
-				# Substract the minimum to all timestamps
-				minimum_ts = spikes_file.min_ts
-				adapted_timestamps = (timestamps - minimum_ts) * settings.ts_tick
+			timestamps = np.asarray(spikes_file.timestamps)
 
-				# Update the maximum and minimum values
-				spikes_file.max_ts = (spikes_file.max_ts - minimum_ts) * settings.ts_tick
-				spikes_file.min_ts = 0
-			else:
-				adapted_timestamps = timestamps * settings.ts_tick
+			# Substract the minimum to all timestamps
+			minimum_ts = spikes_file.min_ts if settings.reset_timestamp else 0
 
-				# Update the maximum and minimum values
-				spikes_file.max_ts = adapted_timestamps[spikes_file.max_ts_index] * settings.ts_tick
-				spikes_file.min_ts = adapted_timestamps[spikes_file.min_ts_index] * settings.ts_tick
-
-			# Update the timestamps
-			spikes_file.timestamps = adapted_timestamps.astype(dtype=np.dtype(">u" + str(settings.timestamp_size)))
+			# Update the timestamps (the minimum and maximum values are recomputed when needed)
+			spikes_file.timestamps = Functions._rescale_timestamps(timestamps, minimum_ts, settings.ts_tick, chunk_size=chunk_size, inplace=inplace)
 		else:
 			print("[Functions.adapt_timestamps] > The SpikesFile timestamps are empty")
 
 
 	@staticmethod
 	def order_SpikesFile(spikes_file, settings):
-		# Indices that would sort the file
-		indexes = np.argsort(spikes_file.timestamps)
+		"""
+		Sorts the events of a SpikesFile by timestamp. Events with the same timestamp keep their original order.
+
+		Parameters:
+				spikes_file (SpikesFile): File to sort.
+				settings (MainSettings): Configuration parameters for the file to sort.
+
+		Returns:
+				None.
 
-		# Sort the arrays
-		spikes_file.addresses = spikes_file.addresses[indexes]
-		spikes_file.timestamps = spikes_file.timestamps[indexes]
+		Note:
+				Only the regions of the file that are out of order are sorted, so files with a few misplaced events are repaired in linear time instead of being fully sorted.
+		"""
+		addresses = np.asarray(spikes_file.addresses)
+		timestamps = np.asarray(spikes_file.timestamps)
+
+		if len(timestamps) < 2:
+			return
+
+		# Events whose timestamp is lesser than the largest previous one are out of order
+		running_max = np.maximum.accumulate(timestamps)
+		late_events = np.flatnonzero(timestamps[1:] < running_max[:-1]) + 1
+
+		if len(late_events) == 0:
+			return
+
+		# Each late event has to move back before the first event whose running maximum is greater than its timestamp
+		region_starts = np.searchsorted(running_max, timestamps[late_events], side='right')
+
+		# Merge overlapping regions [region_start, late_event] into disjoint ones
+		later_min_starts = np.minimum.accumulate(region_starts[::-1])[::-1]
+		new_region = np.ones(len(late_events), dtype=bool)
+		new_region[1:] = later_min_starts[1:] > late_events[:-1]
+		first_of_region = np.flatnonzero(new_region)
+		starts = later_min_starts[first_of_region]
+		ends = np.append(late_events[first_of_region[1:] - 1], late_events[-1]) + 1
+
+		if np.sum(ends - starts) > len(timestamps) // 2:
+			# Too many events out of order: sort the whole file
+			indexes = np.argsort(timestamps, kind='stable')
+			spikes_file.addresses = addresses[indexes]
+			spikes_file.timestamps = timestamps[indexes]
+			return
+
+		addresses = np.array(addresses)
+		timestamps = np.array(timestamps)
+		for start, end in zip(starts, ends):
+			indexes = np.argsort(timestamps[start:end], kind='stable')
+			addresses[start:end] = addresses[start:end][indexes]
+			timestamps[start:end] = timestamps[start:end][indexes]
+
+		spikes_file.addresses = addresses
+		spikes_file.timestamps = timestamps
+
+	@staticmethod
+	def _unwrap_chunk(timestamps, timestamp_range, state=None, late_events=16):
+		"""
+		Removes the overflows of a block of consecutive timestamps, continuing from the state left by the previous block (see unwrap_timestamps).
+
+		Parameters:
+				timestamps (int[]): Raw timestamps of the block.
+				timestamp_range (int): Number of different values of a raw timestamp.
+				state (tuple, optional): State returned for the previous block, or None for the first block. It can also be built as (None, epoch, None) to start a block after epoch overflows.
+				late_events (int, optional): Number of events after an overflow that may still be late events from before it.
+
+		Returns:
+				int[]: Unwrapped timestamps of the block, as a uint64 array, or the input timestamps object itself if no overflows were found up to the end of the block.
+				tuple: State to be passed to the next block: last raw timestamp, number of overflows and number of events since the last overflow (None if there was none).
+		"""
+		previous_timestamp, epoch, since_overflow = (None, 0, None) if state is None else state
+		if len(timestamps) == 0:
+			return timestamps, (previous_timestamp, epoch, since_overflow)
+
+		raw = np.asarray(timestamps).astype(np.int64)
+		deltas = np.empty(len(raw), dtype=np.int64)
+		deltas[0] = 0 if previous_timestamp is None else raw[0] - previous_timestamp
+		np.subtract(raw[1:], raw[:-1], out=deltas[1:])
+		last_timestamp = int(raw[-1])
+
+		# Large differences are rare, so they are handled one by one
+		half_range = timestamp_range // 2
+		candidates = np.flatnonzero((deltas < -half_range) | (deltas > half_range))
+		last_overflow = None if since_overflow is None else -since_overflow
+		changes = None
+		for i in candidates.tolist():
+			if deltas[i] < 0:
+				# A large decrease is an overflow
+				change = 1
+				last_overflow = i
+			elif epoch > 0 and last_overflow is not None and i - last_overflow <= late_events:
+				# A large increase right after an overflow is a late event from the previous epoch
+				change = -1
+			else:
+				# Otherwise, it is a long time without events
+				continue
+			if changes is None:
+				changes = np.zeros(len(raw), dtype=np.int64)
+			changes[i] = change
+			epoch += change
+
+		since_overflow = None if last_overflow is None else len(raw) - last_overflow
+		state = (last_timestamp, epoch, since_overflow)
+
+		if changes is None:
+			if epoch == 0:
+				return timestamps, state
+			changes = np.zeros(len(raw), dtype=np.int64)
+
+		epochs = np.cumsum(changes, out=changes)
+		epochs += epoch - int(epochs[-1])
+		epochs *= timestamp_range
+		raw += epochs
+
+		if raw.min() >= 0:
+			raw = raw.view(np.uint64)
+		return raw, state
+
+	@staticmethod
+	def unwrap_timestamps(timestamps, timestamp_size, chunk_size=1048576, mode='full', num_samples=16):
+		"""
+		Removes the overflows (wraparounds) of the timestamps of a recording, which happen when timestamps reach the maximum value that fits in timestamp_size bytes and start again from 0.
+
+		Parameters:
+				timestamps (int[]): Timestamps to unwrap.
+				timestamp_size (int): Number of bytes of each timestamp in the file.
+				chunk_size (int, optional): Number of timestamps unwrapped at once.
+				mode (string, optional): Set to 'full' to look for overflows in every timestamp, to 'sample' to look for them only in num_samples chunks evenly spread over the file and between consecutive chunks, or to 'none' to skip the unwrapping. As in validate_SpikesFile.
+				num_samples (int, optional): Number of chunks checked when mode is set to 'sample'.
+
+		Returns:
+				int[]: Unwrapped timestamps, as a uint64 array if at least one overflow was found, or the input timestamps object itself otherwise (so memory-mapped timestamps stay memory-mapped).
+
+		Note:
+				An overflow is detected when a timestamp is lesser than its previous one by more than half of the timestamp range. A timestamp greater than its previous one by more than half of the range is a long time without events, unless it comes within the 16 events after an overflow, in which case it is considered an event from before the overflow that arrived late, and it is kept in the previous epoch. Smaller differences are considered events out of order (see order_SpikesFile).
+
+				When mode is set to 'sample' and an overflow is found, all the timestamps are unwrapped as in 'full' mode. Overflows between two sampled chunks are only found if the timestamps between them span less than the timestamp range.
+
+		Raises:
+				ValueError: If mode is not 'full', 'sample' or 'none'.
+		"""
+		Functions._check_mode(mode, 'Functions.unwrap_timestamps')
+		if mode == 'none':
+			return timestamps
+
+		original_timestamps = timestamps
+		timestamps = np.asarray(timestamps)
+		timestamp_range = 1 << (8 * timestamp_size)
+
+		if mode == 'sample':
+			# Unwrap the whole file only if an overflow is found in the sampled chunks or between them
+			state = None
+			for start in Functions._chunk_starts(len(timestamps), chunk_size, mode, num_samples):
+				chunk = timestamps[start:start + chunk_size]
+				unwrapped_chunk, state = Functions._unwrap_chunk(chunk, timestamp_range, state)
+				if unwrapped_chunk is not chunk:
+					break
+			else:
+				return original_timestamps
+
+		unwrapped = None
+		state = None
+		for start in range(0, len(timestamps), chunk_size):
+			end = min(start + chunk_size, len(timestamps))
+			chunk = timestamps[start:end]
+			unwrapped_chunk, state = Functions._unwrap_chunk(chunk, timestamp_range, state)
+
+			# The output is only allocated once the first overflow is found
+			if unwrapped is None and unwrapped_chunk is not chunk:
+				unwrapped = np.empty(len(timestamps), dtype=np.int64)
+				unwrapped[:start] = timestamps[:start]
+			if unwrapped is not None:
+				unwrapped[start:end] = unwrapped_chunk
+
+		if unwrapped is None:
+			return original_timestamps
+		if unwrapped.min() >= 0:
+			unwrapped = unwrapped.view(np.uint64)
+		return unwrapped
+
+
+	@staticmethod
+	def _merge_arrays(addresses_list, timestamps_list):
+		"""
+		Merges several lists of addresses and timestamps sorted by timestamp into a single pair sorted by timestamp.
+
+		Parameters:
+				addresses_list (list): Addresses of each input.
+				timestamps_list (list): Timestamps of each input.
+
+		Returns:
+				int[]: Merged addresses.
+				int[]: Merged timestamps.
+
+		Note:
+				Inputs are concatenated and sorted with a stable sort, which merges the sorted runs (timsort) in O(n log k). Spikes with the same timestamp keep the order of the inputs, and then their order inside each input.
+		"""
+		if len(timestamps_list) == 0:
+			return np.zeros(0, dtype=np.uint16), np.zeros(0, dtype=np.uint32)
+		addresses = np.concatenate(addresses_list)
+		timestamps = np.concatenate(timestamps_list)
+		if len(timestamps_list) > 1:
+			order = np.argsort(timestamps, kind='stable')
+			addresses = addresses[order]
+			timestamps = timestamps[order]
+		return addresses, timestamps
+
+	@staticmethod
+	def merge(spikes_files, address_offsets=None):
+		"""
+		Merges several SpikesFiles sorted by timestamp into a single SpikesFile sorted by timestamp.
+
+		Parameters:
+				spikes_files (list): SpikesFiles to merge.
+				address_offsets (int[], optional): Offset added to the addresses of each SpikesFile. If None, addresses are not modified.
+
+		Returns:
+				SpikesFile: Merged SpikesFile.
+
+		Note:
+				Spikes with the same timestamp are ordered by the position of their SpikesFile in spikes_files, so the result is deterministic.
+				For example, a stereo file can be built from two mono files with Functions.merge([left, right], [0, settings.num_channels*(settings.on_off_both+1)]).
+		"""
+		if address_offsets is None:
+			address_offsets = [0] * len(spikes_files)
+		if len(address_offsets) != len(spikes_files):
+			raise ValueError("[Functions.merge] > ParametersError: address_offsets must have one offset per SpikesFile.")
+
+		addresses_list = []
+		timestamps_list = []
+		for spikes_file, offset in zip(spikes_files, address_offsets):
+			addresses = np.asarray(spikes_file.addresses)
+			addresses_list.append(addresses.astype(np.int64) + offset if offset != 0 else addresses)
+			timestamps_list.append(np.asarray(spikes_file.timestamps))
+
+		addresses, timestamps = Functions._merge_arrays(addresses_list, timestamps_list)
+		return SpikesFile(addresses, timestamps)
+
+	@staticmethod
+	def merge_stream(spikes_streams, address_offsets=None):
+		"""
+		Merges several streams of SpikesFile chunks sorted by timestamp (e.g. Loaders.iter_AEDAT) into a single stream of chunks sorted by timestamp.
+
+		Parameters:
+				spikes_streams (list): Iterables of SpikesFile chunks to merge.
+				address_offsets (int[], optional): Offset added to the addresses of each stream. If None, addresses are not modified.
+
+		Returns:
+				generator: Merged SpikesFile chunks.
+
+		Note:
+				A chunk is yielded every time a new chunk is read. It contains the spikes whose timestamps are lower than the watermark, which is the last timestamp read from the stream that is behind the others. Only the spikes after the watermark are kept in memory.
+				The concatenation of the yielded chunks is the same as the result of merge over the whole streams.
+		"""
+		if address_offsets is None:
+			address_offsets = [0] * len(spikes_streams)
+		if len(address_offsets) != len(spikes_streams):
+			raise ValueError("[Functions.merge_stream] > ParametersError: address_offsets must have one offset per stream.")
+
+		iterators = [iter(stream) for stream in spikes_streams]
+		buffers_addresses = [np.zeros(0, dtype=np.int64) for _ in iterators]
+		buffers_timestamps = [np.zeros(0, dtype=np.uint32) for _ in iterators]
+		active = [True] * len(iterators)
+
+		def read(i):
+			# Reads chunks until a non-empty one is found or the stream ends
+			for chunk in iterators[i]:
+				if len(chunk.timestamps) > 0:
+					addresses = np.asarray(chunk.addresses)
+					if address_offsets[i] != 0:
+						addresses = addresses.astype(np.int64) + address_offsets[i]
+					buffers_addresses[i] = np.concatenate((buffers_addresses[i], addresses))
+					buffers_timestamps[i] = np.concatenate((buffers_timestamps[i], np.asarray(chunk.timestamps)))
+					return
+			active[i] = False
+
+		for i in range(len(iterators)):
+			read(i)
+
+		while any(active):
+			watermark = min(buffers_timestamps[i][-1] for i in range(len(iterators)) if active[i])
+
+			# Spikes before the watermark can be merged: no stream can produce earlier spikes
+			addresses_list = []
+			timestamps_list = []
+			for i in range(len(iterators)):
+				cut = np.searchsorted(buffers_timestamps[i], watermark, side='left')
+				addresses_list.append(buffers_addresses[i][:cut])
+				timestamps_list.append(buffers_timestamps[i][:cut])
+				buffers_addresses[i] = buffers_addresses[i][cut:]
+				buffers_timestamps[i] = buffers_timestamps[i][cut:]
+			addresses, timestamps = Functions._merge_arrays(addresses_list, timestamps_list)
+			if len(timestamps) > 0:
+				yield SpikesFile(addresses, timestamps)
+
+			# Read from the streams that are behind
+			for i in range(len(iterators)):
+				if active[i] and buffers_timestamps[i][-1] == watermark:
+					read(i)
+
+		addresses, timestamps = Functions._merge_arrays(buffers_addresses, buffers_timestamps)
+		if len(timestamps) > 0:
+			yield SpikesFile(addresses, timestamps)
 
 
 	@staticmethod
@@ -204,26 +739,30 @@ class Functions:
 		"""
 
 		if settings.on_off_both == 1:
-			prevSpike = [None] * (settings.num_channels) * (1 + settings.mono_stereo)
-			phaseLockedAddrs = []
-			phaseLockedTs = []
-			for i in range(len(spikes_file.addresses)):
-				if prevSpike[spikes_file.addresses[i]//2] == None:
-					prevSpike[spikes_file.addresses[i]//2] = spikes_file.addresses[i]%2
-				else:
-					if (prevSpike[spikes_file.addresses[i]//2] == 0 and spikes_file.addresses[i]%2 == 1) or ((prevSpike[spikes_file.addresses[i]//2] == 1 and spikes_file.addresses[i]%2 == 0) and posNeg_both):
-						phaseLockedAddrs.append(spikes_file.addresses[i]//2)
-						phaseLockedTs.append(spikes_file.timestamps[i])
-						prevSpike[spikes_file.addresses[i]//2] = spikes_file.addresses[i]%2
-					else:
-						prevSpike[spikes_file.addresses[i]//2] = spikes_file.addresses[i]%2
-			spikes_file = SpikesFile([], [])
-			spikes_file.addresses = phaseLockedAddrs
-			spikes_file.min_ts = np.min(phaseLockedTs)
-			spikes_file.max_ts = np.max(phaseLockedTs)
-			spikes_file.min_ts_index = np.argmin(phaseLockedTs)
-			spikes_file.max_ts_index = np.argmax(phaseLockedTs)
-			spikes_file.timestamps = phaseLockedTs
+			addresses = np.asarray(spikes_file.addresses)
+			timestamps = np.asarray(spikes_file.timestamps)
+			channels = addresses // 2
+			polarities = addresses % 2
+
+			# Group the spikes by channel, keeping their time order inside each channel
+			order = np.argsort(channels, kind='stable')
+			channels_sorted = channels[order]
+			polarities_sorted = polarities[order]
+
+			# Compare the polarity of each spike with the previous spike of the same channel
+			same_channel = channels_sorted[1:] == channels_sorted[:-1]
+			previous = polarities_sorted[:-1]
+			current = polarities_sorted[1:]
+			transitions = (previous == 0) & (current == 1)
+			if posNeg_both:
+				transitions |= (previous == 1) & (current == 0)
+			transitions &= same_channel
+
+			# Restore the original time order
+			indexes = np.sort(order[1:][transitions])
+			phaseLockedAddrs = channels[indexes]
+			phaseLockedTs = timestamps[indexes]
+			spikes_file = SpikesFile(phaseLockedAddrs, phaseLockedTs)
 			return spikes_file
 		else:
 			print("[Functions.phase_lock] > SettingsError: this functionality cannot be applied to files that do not have ON/positive and OFF/negative addresses. Check the on_off_both setting for more information.")
@@ -251,12 +790,13 @@ class Functions:
 		"""
 
 		if settings.mono_stereo:
-			addr_ts = list(zip(spikes_file.addresses, spikes_file.timestamps))
-			addr_ts = [x for x in addr_ts if x[0] >= left_right*settings.num_channels*(settings.on_off_both + 1) and x[0] < (left_right+1)*settings.num_channels*(settings.on_off_both + 1)]
+			first_address = left_right*settings.num_channels*(settings.on_off_both + 1)
+			last_address = (left_right+1)*settings.num_channels*(settings.on_off_both + 1)
+			addresses = np.asarray(spikes_file.addresses)
 
-			spikes_file_mono = Utils.extract_addr_and_ts(addr_ts)
+			spikes_file_mono = spikes_file.select((addresses >= first_address) & (addresses < last_address))
 			if left_right:
-				spikes_file_mono.addresses = [x-left_right*settings.num_channels*(settings.on_off_both + 1) for x in spikes_file_mono.addresses]
+				spikes_file_mono.addresses = spikes_file_mono.addresses - first_address
 
 
 			if return_save_both == 0:
@@ -290,20 +830,29 @@ class Functions:
 				SettingsError: If the input file is a stereo SpikesFile (settings.mono_stereo is set to 1).
 
 		Note:	The timestamp of the left event is used as reference. Thus, the timestamp of the right event will be ts_right = ts_left + delay.
+				If delay is negative, all the timestamps are increased by -delay, so that none of them is negative.
+				The output is sorted by timestamp, and left spikes go before right spikes with the same timestamp (see merge).
 		"""
 
 		if settings.mono_stereo == 0:
-			spikes_file_new = copy.deepcopy(spikes_file)
-			newAddrs = [(x + settings.num_channels*(settings.on_off_both+1)) for x in spikes_file_new.addresses]
-			spikes_file_new.addresses.extend(newAddrs)
-			newTs = [(x + delay) for x in spikes_file_new.timestamps]
-			spikes_file_new.timestamps.extend(newTs)
-			addr_ts = list(zip(spikes_file_new.addresses, spikes_file_new.timestamps))
-			addr_ts = sorted(addr_ts, key=lambda v: (v, random.random())) #key=getKey)  #THIS DISORDERS TSS
-			spikes_file_new = Utils.extract_addr_and_ts(addr_ts)
-
-			if delay < 0:
-				spikes_file_new.timestamps = [x-delay for x in spikes_file_new.timestamps]
+			addresses = np.asarray(spikes_file.addresses)
+			timestamps = np.asarray(spikes_file.timestamps)
+
+			# Delay the right spikes, or the left ones if the delay is negative, so that no timestamp becomes negative
+			shift = abs(int(delay))
+			if len(timestamps) > 0 and timestamps.dtype.kind in 'iu' and int(spikes_file.max_ts) + shift > np.iinfo(timestamps.dtype).max:
+				timestamps = timestamps.astype(np.uint64)
+			delayed_timestamps = timestamps + timestamps.dtype.type(shift)
+
+			if delay >= 0:
+				left = SpikesFile(addresses, timestamps)
+				right = SpikesFile(addresses, delayed_timestamps)
+			else:
+				left = SpikesFile(addresses, delayed_timestamps)
+				right = SpikesFile(addresses, timestamps)
+
+			# Left spikes go first when timestamps are equal
+			spikes_file_new = Functions.merge([left, right], [0, settings.num_channels*(settings.on_off_both+1)])
 
 			if return_save_both == 0:
 				return spikes_file_new
@@ -331,22 +880,16 @@ class Functions:
 
 		Returns:
 				SpikesFile:  SpikesFile containing only the information from the addresses specified as input from spikes_file.
+
+		Note:
+				The spikes are gathered with the per-address index of the SpikesFile (see SpikesFile.address_index), which is built only once per file.
 		"""
 
 		if verbose == True: start_time = time.time()
-		spikes_per_channels_ts = []
-		spikes_per_channel_addr = []
-		for i in range(len(spikes_file.timestamps)):
-			if spikes_file.addresses[i] in addresses:
-				spikes_per_channels_ts.append(spikes_file.timestamps[i])
-				spikes_per_channel_addr.append(spikes_file.addresses[i])
+		new_spikes_file = spikes_file.extract_channels(addresses)
 		if verbose == True: print('EXTRACT CHANNELS CALCULATION', time.time() - start_time)
-		new_spikes_file = SpikesFile([], [])
-		new_spikes_file.addresses = spikes_per_channel_addr
 		if reset_addresses == True:
-			new_spikes_file.addresses = [addr - addresses[0] for addr in new_spikes_file.addresses]
-		new_spikes_file.timestamps = spikes_per_channels_ts
-		new_spikes_file = Utils.order_timestamps(new_spikes_file)
+			new_spikes_file.addresses = new_spikes_file.addresses.astype(np.int64) - addresses[0]
 		return new_spikes_file
 
 
@@ -362,6 +905,9 @@ class Functions:
 
 		Returns:
 				int[]: inter-spike interval array.
+
+		Note:
+				Intervals are computed between consecutive spikes of the whole file, regardless of their addresses. See channels_ISI for per-channel intervals.
 		"""
 
 		if verbose == True: start_time = time.time()
@@ -370,4 +916,98 @@ class Functions:
 
 		if verbose == True: print('ISI CALCULATION', time.time() - start_time)
 
-		return isi_array
\ No newline at end of file
+		return isi_array
+
+	@staticmethod
+	def channels_ISI(spikes_file, settings, num_bins=50, log_bins=True, isi_range=None, merge_polarities=False, percentiles=(5, 50, 95), verbose=False):
+		"""
+		Computes the inter-spike interval (ISI) histogram and statistics of every address (or channel) of a SpikesFile.
+
+		Parameters:
+				spikes_file (SpikesFile): File to use.
+				settings (MainSettings): Configuration parameters for the input file.
+				num_bins (int, optional): Number of bins of the histograms.
+				log_bins (boolean, optional): Set to True to use logarithmically spaced bins, or to False to use linearly spaced bins.
+				isi_range (tuple, optional): (minimum, maximum) ISI covered by the bins. If None, the range of the ISIs of the file is used.
+				merge_polarities (boolean, optional): Set to True to merge the ON and OFF addresses of each channel (address//2). Only used if on_off_both is set to 1.
+				percentiles (tuple, optional): Percentiles (between 0 and 100) to compute for each address.
+				verbose (boolean, optional): Set to True if you want the execution time of the function to be printed.
+
+		Returns:
+				int[ , ]: ISI histograms, with shape (num_addresses, num_bins).
+				float[]: Edges of the bins, with num_bins + 1 values.
+				dict: Statistics of each address: 'count' (number of ISIs), 'mean' (mean ISI), 'cv' (coefficient of variation, std/mean) and 'percentiles' (array with shape (num_addresses, len(percentiles))). Addresses without ISIs have NaN statistics.
+
+		Notes:
+				The number of addresses is num_channels*(on_off_both + 1)*(mono_stereo + 1), or half of it if merge_polarities is set to True. Spikes with other addresses are ignored.
+
+				All the addresses are processed together: spikes are sorted by address (and time) once, ISIs are the differences between consecutive spikes of the same address, and histograms and statistics are accumulated with bincount over the sorted segments.
+
+				ISIs out of isi_range (and ISIs equal to 0 when log_bins is True) are not counted in the histograms, but they are used in the statistics.
+		"""
+
+		if verbose == True: start_time = time.time()
+
+		num_addresses = settings.num_channels * (settings.on_off_both + 1) * (settings.mono_stereo + 1)
+		merge_polarities = merge_polarities and settings.on_off_both == 1
+
+		# Sort the spikes by address, keeping them in time order inside each address
+		if merge_polarities:
+			num_addresses //= 2
+			keys = np.asarray(spikes_file.addresses) // 2
+			if spikes_file.is_sorted:
+				order = np.argsort(keys, kind='stable')
+			else:
+				order = np.lexsort((spikes_file.timestamps, keys))
+			keys = keys[order]
+			timestamps = np.asarray(spikes_file.timestamps)[order]
+		else:
+			_, offsets, timestamps = spikes_file.address_index
+			keys = np.repeat(np.arange(len(offsets) - 1), np.diff(offsets))
+
+		# ISIs between consecutive spikes of the same address
+		same_address = (keys[1:] == keys[:-1]) & (keys[1:] < num_addresses)
+		isi = (timestamps[1:].astype(np.int64) - timestamps[:-1].astype(np.int64))[same_address]
+		isi_keys = keys[1:][same_address].astype(np.int64)
+
+		# Bins
+		if isi_range is None:
+			positive = isi[isi > 0] if log_bins else isi
+			isi_range = (positive.min(), positive.max()) if len(positive) > 0 else (1, 1)
+		isi_min, isi_max = isi_range
+		if log_bins:
+			isi_min = max(isi_min, 1)
+			bin_edges = np.geomspace(isi_min, max(isi_max, isi_min), num_bins + 1)
+		else:
+			bin_edges = np.linspace(isi_min, max(isi_max, isi_min), num_bins + 1)
+
+		# Histograms (the last bin includes its right edge, as in numpy.histogram)
+		bin_indexes = np.searchsorted(bin_edges, isi, side='right') - 1
+		bin_indexes[isi == bin_edges[-1]] = num_bins - 1
+		in_range = (bin_indexes >= 0) & (bin_indexes < num_bins)
+		histograms = np.bincount(isi_keys[in_range] * num_bins + bin_indexes[in_range], minlength=num_addresses * num_bins).reshape(num_addresses, num_bins)
+
+		# Mean and coefficient of variation
+		counts = np.bincount(isi_keys, minlength=num_addresses)
+		with np.errstate(invalid='ignore', divide='ignore'):
+			means = np.bincount(isi_keys, weights=isi, minlength=num_addresses) / counts
+			deviations = isi - means[isi_keys]
+			stds = np.sqrt(np.bincount(isi_keys, weights=deviations * deviations, minlength=num_addresses) / counts)
+			cvs = stds / means
+
+		# Percentiles (linear interpolation, as in numpy.percentile) over the ISIs of each address sorted by value
+		sorted_isi = isi[np.lexsort((isi, isi_keys))]
+		starts = np.zeros(num_addresses, dtype=np.int64)
+		np.cumsum(counts[:-1], out=starts[1:])
+		has_isi = counts > 0
+		percentile_values = np.full((num_addresses, len(percentiles)), np.nan)
+		for i, percentile in enumerate(percentiles):
+			positions = starts[has_isi] + percentile / 100 * (counts[has_isi] - 1)
+			lower = np.floor(positions).astype(np.int64)
+			upper = np.ceil(positions).astype(np.int64)
+			percentile_values[has_isi, i] = sorted_isi[lower] + (sorted_isi[upper] - sorted_isi[lower]) * (positions - lower)
+
+		if verbose == True: print('CHANNELS ISI CALCULATION', time.time() - start_time)
+
+		stats = {'count': counts, 'mean': means, 'cv': cvs, 'percentiles': percentile_values}
+		return histograms, bin_edges, stats
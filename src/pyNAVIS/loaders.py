@@ -20,13 +20,23 @@
 #################################################################################
 
 
+import hashlib
+import io
+import itertools
 import math
-import struct
-import csv
+import os
+import shutil
+import tempfile
+import uuid
+import weakref
+from concurrent.futures import ProcessPoolExecutor, as_completed
 import numpy as np
 from .functions import Functions
 from .objects import SpikesFile
 from .objects import LocalizationFile
+from .objects import AEDATIndex
+from .objects import AEDATInfo
+from .main_settings import MainSettings
 
 
 class Loaders:
@@ -35,69 +45,145 @@ class Loaders:
     """
 
     @staticmethod
-    def loadAEDAT(path, settings):
+    def _find_AEDAT_header_end(file):
+        """
+        Finds the position of the first event in an AEDAT file, skipping its ASCII header (lines starting with '#').
+
+        Parameters:
+                file (file): AEDAT file opened in binary mode.
+
+        Returns:
+                int: Number of bytes of the header, or 0 if the file has no header.
+
+        Note:
+                The header ends with the '#End Of ASCII Header' line. Files without it only have a header if they start with '#!AER-DAT', in which case all their leading lines starting with '#' are skipped. Otherwise, files are read from their first byte, even if it is '#', since events whose first byte is 0x23 would be taken as part of a header.
+        """
+        end_string = b"#End Of ASCII Header"
+
+        file.seek(0)
+        index = 0
+        line = file.readline()
+        has_version = line.startswith(b"#!AER-DAT")
+        while line and line[0] == ord("#"):
+            index += len(line)
+            if line.startswith(end_string):
+                return index
+            line = file.readline()
+
+        return index if has_version else 0
+
+    @staticmethod
+    def _AEDAT_events_struct(settings):
+        """
+        Builds the NumPy dtype of a single AEDAT event (address followed by timestamp, both big-endian).
+
+        Parameters:
+                settings (MainSettings): Configuration parameters for the file to load.
+
+        Returns:
+                numpy.dtype: Structured dtype with the fields 'f0' (address) and 'f1' (timestamp).
+        """
+        if settings.address_size != 3 and settings.timestamp_size != 3:
+            address_param = ">u" + str(settings.address_size)
+            timestamp_param = ">u" + str(settings.timestamp_size)
+            return np.dtype(address_param + ", " + timestamp_param)
+        else:
+            # Separate addresses and timestamps as raw bytes
+            return np.dtype([("f0", "u1", (settings.address_size,)),
+                             ("f1", "u1", (settings.timestamp_size,))])
+
+    @staticmethod
+    def _decode_uint_bytes(field_bytes):
+        """
+        Builds native-endian integers from their big-endian bytes.
+
+        Parameters:
+                field_bytes (numpy.ndarray): Array of shape (number of values, bytes per value) with the bytes of each value (from 1 to 4 bytes).
+
+        Returns:
+                numpy.ndarray: uint32 array with the values.
+        """
+        values = np.asarray(field_bytes[:, 0]).astype(np.uint32)
+        for i in range(1, field_bytes.shape[1]):
+            values <<= 8
+            values |= field_bytes[:, i]
+        return values
+
+    @staticmethod
+    def _decode_AEDAT_events(spikes, settings):
+        """
+        Extracts the addresses and timestamps from an array of AEDAT events.
+
+        Parameters:
+                spikes (numpy.ndarray): Events with the dtype returned by _AEDAT_events_struct.
+                settings (MainSettings): Configuration parameters for the file to load.
+
+        Returns:
+                numpy.ndarray: Addresses of the events.
+                numpy.ndarray: Timestamps of the events.
+
+        Note:
+                When any of the fields uses 3 bytes, both fields are built as uint32 directly from the bytes of the events, without intermediate padded copies.
+        """
+        if settings.address_size != 3 and settings.timestamp_size != 3:
+            return spikes['f0'], spikes['f1']
+
+        return Loaders._decode_uint_bytes(spikes['f0']), Loaders._decode_uint_bytes(spikes['f1'])
+
+    @staticmethod
+    def loadAEDAT(path, settings, mmap=False, validate='full'):
         """
         Loads an AEDAT (.aedat) file.
 
         Parameters:
                 path (string): Full path of the AEDAT file to be loaded, including name and extension.
                 settings (MainSettings): Configuration parameters for the file to load.
+                mmap (boolean, optional): Set to True to memory-map the events of the file instead of reading the whole file into memory.
+                validate (string, optional): Set to 'full' to check all the events of the file, to 'sample' to check only a sample of them, or to 'none' to skip the checks for trusted files. See Functions.validate_SpikesFile.
 
         Returns:
                 SpikesFile: SpikesFile containing all the addresses and timestamps of the file.
+
+        Note:
+                When mmap is set to True, the addresses and timestamps of the returned SpikesFile are read-only views of the file on disk, and only the parts of the file that are accessed are loaded into memory.
+                The file should not be modified while the SpikesFile is in use.
+
+                Unless validate is set to 'none', timestamp overflows (wraparounds) are removed (see Functions.unwrap_timestamps) and events out of order are sorted (see Functions.order_SpikesFile).
+                With validate set to 'sample', overflows are only looked for in the sampled chunks and between them, so the whole file is only read when an overflow is found.
         """
-        # Read all the file
-        file = open(path, "rb")
-        file_data = file.read()
+        event_size = settings.address_size + settings.timestamp_size
 
-        # Find last header line
-        end_string = "#End Of ASCII Header\r\n"
-        index = file_data.find(end_string.encode("utf-8"))
-        if index != -1:
-            index += len(end_string)
-        else:
-            index = 0
+        with open(path, "rb") as file:
+            # Find last header line
+            index = Loaders._find_AEDAT_header_end(file)
 
-        # Raw data extraction
-        num_spikes = int(math.floor(len(file_data[index:]) / (settings.address_size + settings.timestamp_size)))
-        spikes_array = file_data[index:index + num_spikes * (settings.address_size + settings.timestamp_size)]
+            # Number of complete events after the header
+            file.seek(0, 2)
+            num_spikes = int(math.floor((file.tell() - index) / event_size))
 
-        if settings.address_size != 3 and settings.timestamp_size != 3:
-            address_param = ">u" + str(settings.address_size)
-            timestamp_param = ">u" + str(settings.timestamp_size)
-            bytes_struct = np.dtype(address_param + ", " + timestamp_param)
+            # Raw data extraction
+            if not mmap:
+                file.seek(index)
+                spikes_array = file.read(num_spikes * event_size)
 
-            spikes = np.frombuffer(spikes_array, bytes_struct)
-            addresses = spikes['f0']
-            timestamps = spikes['f1']
+        spikes_struct = Loaders._AEDAT_events_struct(settings)
 
-        else:
-            # Separate addresses and timestamps
-            spikes_struct = np.dtype([("addresses", ">u1", settings.address_size),
-                                      ("timestamps", ">u1", settings.timestamp_size)])
+        if not mmap:
             spikes = np.frombuffer(spikes_array, spikes_struct)
+        elif num_spikes > 0:
+            spikes = np.memmap(path, dtype=spikes_struct, mode="r", offset=index, shape=(num_spikes,))
+        else:
+            spikes = np.zeros(0, dtype=spikes_struct)
 
-            # Fill addresses and timestamps with zeros to reach 4-bytes per element
-            address_struct = np.dtype([("zeros", ">u1", (4 - settings.address_size,)),
-                                       ("addresses", ">u1", (settings.address_size,))])
-            timestamp_struct = np.dtype([("zeros", ">u1", (4 - settings.timestamp_size,)),
-                                         ("timestamps", ">u1", (settings.timestamp_size,))])
-            filled_addresses = np.zeros(len(spikes), dtype=address_struct)
-            filled_timestamps = np.zeros(len(spikes), dtype=timestamp_struct)
-            filled_addresses['addresses'] = spikes['addresses']
-            filled_timestamps['timestamps'] = spikes['timestamps']
+        addresses, timestamps = Loaders._decode_AEDAT_events(spikes, settings)
 
-            # View these filled addresses and timestamps as 4-byte ints
-            addresses = filled_addresses.view(">u4")
-            timestamps = filled_timestamps.view(">u4")
+        # Long recordings may overflow the timestamps
+        timestamps = Functions.unwrap_timestamps(timestamps, settings.timestamp_size, mode=validate)
 
         spikes_file = SpikesFile(addresses, timestamps)
 
-        # Close the file
-        file.close()
-
         # Check correct address values and increasing timestamp order in the loaded aedat file
-        _, order_is_ok, all_in_range = Functions.check_SpikesFile(spikes_file, settings)
+        _, order_is_ok, all_in_range = Functions.check_SpikesFile(spikes_file, settings, mode=validate)
         if not all_in_range:
             raise ValueError("Addresses are not in range. Could be due to bad decoding")
         if not order_is_ok:
@@ -105,8 +191,562 @@ class Loaders:
 
         return spikes_file
 
+    @staticmethod
+    def iter_AEDAT(path, settings, chunk_events=1000000, unwrap=True):
+        """
+        Reads an AEDAT (.aedat) file in chunks, yielding a SpikesFile for each block of consecutive events.
+
+        Parameters:
+                path (string): Full path of the AEDAT file to be loaded, including name and extension.
+                settings (MainSettings): Configuration parameters for the file to load.
+                chunk_events (int, optional): Maximum number of events contained in each chunk.
+                unwrap (boolean, optional): Set to False to keep the timestamps as stored in the file, without removing their overflows.
+
+        Returns:
+                generator: Generator of SpikesFile objects, each one containing up to chunk_events events of the file, in file order.
+
+        Note:
+                Only one chunk is kept in memory at a time, so files larger than the available memory can be processed.
+                Timestamp overflows are removed across chunks as in loadAEDAT (see Functions.unwrap_timestamps), but unlike loadAEDAT, chunks are neither checked nor sorted.
+        """
+        event_size = settings.address_size + settings.timestamp_size
+        spikes_struct = Loaders._AEDAT_events_struct(settings)
+
+        # Overflow state carried from one chunk to the next
+        timestamp_range = 1 << (8 * settings.timestamp_size)
+        unwrap_state = None
+
+        with open(path, "rb") as file:
+            file.seek(Loaders._find_AEDAT_header_end(file))
+
+            while True:
+                chunk_data = file.read(chunk_events * event_size)
+                num_spikes = len(chunk_data) // event_size
+                if num_spikes == 0:
+                    break
+
+                spikes = np.frombuffer(chunk_data, spikes_struct, count=num_spikes)
+                addresses, timestamps = Loaders._decode_AEDAT_events(spikes, settings)
+                if unwrap:
+                    timestamps, unwrap_state = Functions._unwrap_chunk(timestamps, timestamp_range, unwrap_state)
+                yield SpikesFile(addresses, timestamps)
+
+                if num_spikes < chunk_events:
+                    break
+
+    @staticmethod
+    def probe_AEDAT(path, settings):
+        """
+        Gets the number of events, the first and last timestamps, the duration and the header of an AEDAT (.aedat) file without reading its events.
+
+        Parameters:
+                path (string): Full path of the AEDAT file, including name and extension.
+                settings (MainSettings): Configuration parameters for the file.
+
+        Returns:
+                AEDATInfo: Information about the file.
+
+        Note:
+                Only the header and the first and last events of the file are read, so timestamps of the file are assumed to be in increasing order.
+        """
+        event_size = settings.address_size + settings.timestamp_size
+
+        with open(path, "rb") as file:
+            header_end = Loaders._find_AEDAT_header_end(file)
+            file.seek(0)
+            header = [line.decode("latin-1").rstrip("\r\n") for line in file.read(header_end).splitlines(True)]
+
+            file.seek(0, 2)
+            file_size = file.tell()
+            num_events = (file_size - header_end) // event_size
+
+            first_ts = None
+            last_ts = None
+            if num_events > 0:
+                file.seek(header_end + settings.address_size)
+                first_ts = int.from_bytes(file.read(settings.timestamp_size), "big")
+                file.seek(header_end + (num_events - 1) * event_size + settings.address_size)
+                last_ts = int.from_bytes(file.read(settings.timestamp_size), "big")
+
+        version = None
+        if header and header[0].startswith("#!AER-DAT"):
+            version = header[0][len("#!AER-DAT"):].strip()
+
+        return AEDATInfo(num_events=num_events, first_ts=first_ts, last_ts=last_ts,
+                         duration=(last_ts - first_ts) * settings.ts_tick if num_events > 0 else 0,
+                         header=header, version=version, header_end=header_end, file_size=file_size)
+
+    @staticmethod
+    def _bisect_AEDAT(file, header_end, lo, hi, timestamp, settings, right=False):
+        """
+        Binary searches the events of an AEDAT file on disk, reading only one timestamp per step.
+
+        Parameters:
+                file (file): AEDAT file opened in binary mode.
+                header_end (int): Number of bytes of the header of the file.
+                lo (int): Index of the first event of the search range.
+                hi (int): Index of the last event of the search range plus one.
+                timestamp (int): Timestamp to look for.
+                settings (MainSettings): Configuration parameters for the file.
+                right (boolean, optional): If False, returns the index of the first event whose timestamp is greater than or equal to timestamp. If True, returns the index of the first event whose timestamp is greater than timestamp.
+
+        Returns:
+                int: Index of the event.
+
+        Note:
+                Timestamps of the file need to be in increasing order.
+        """
+        event_size = settings.address_size + settings.timestamp_size
+
+        while lo < hi:
+            mid = (lo + hi) // 2
+            file.seek(header_end + mid * event_size + settings.address_size)
+            mid_timestamp = int.from_bytes(file.read(settings.timestamp_size), "big")
+            if mid_timestamp < timestamp or (right and mid_timestamp == timestamp):
+                lo = mid + 1
+            else:
+                hi = mid
+        return lo
+
+    @staticmethod
+    def load_AEDAT_range(path, settings, t_start, t_end, use_index=True, validate='full'):
+        """
+        Loads the events of an AEDAT (.aedat) file whose timestamps are in the range [t_start, t_end], without reading the rest of the file.
+
+        Parameters:
+                path (string): Full path of the AEDAT file to be loaded, including name and extension.
+                settings (MainSettings): Configuration parameters for the file to load.
+                t_start (int): First timestamp of the range.
+                t_end (int): Last timestamp of the range.
+                use_index (boolean, optional): If True and the file has an up-to-date index (see index_AEDAT), the sparse table of the index is used to locate the range.
+                validate (string, optional): Same as in loadAEDAT.
+
+        Returns:
+                SpikesFile: SpikesFile containing the addresses and timestamps of the events of the file in the given range.
+
+        Note:
+                t_start and t_end are timestamps as returned by loadAEDAT (before applying ts_tick and reset_timestamp).
+
+                The events of the file are located with a binary search, so timestamps should be in increasing order.
+                The sparse table of the index holds unwrapped timestamps (see Functions.unwrap_timestamps), so files whose timestamps overflow need an up-to-date index. Without it, the file is searched by its raw timestamps, which assumes that they do not overflow before t_end.
+        """
+        event_size = settings.address_size + settings.timestamp_size
+
+        with open(path, "rb") as file:
+            index = Loaders._find_AEDAT_header_end(file)
+            file.seek(0, 2)
+            num_spikes = (file.tell() - index) // event_size
+
+            aedat_index = Loaders.load_AEDAT_index(path, settings) if use_index else None
+            if aedat_index is not None and aedat_index.num_events == num_spikes:
+                # Read the strides of the sparse table that contain the range
+                a, _ = Loaders._AEDAT_index_bounds(aedat_index, t_start)
+                _, b = Loaders._AEDAT_index_bounds(aedat_index, t_end, right=True)
+                b = max(a, b)
+            else:
+                aedat_index = None
+                # Locate the range with two binary searches
+                a = Loaders._bisect_AEDAT(file, index, 0, num_spikes, t_start, settings)
+                b = Loaders._bisect_AEDAT(file, index, a, num_spikes, t_end, settings, right=True)
+
+            # Read only the events inside the range
+            file.seek(index + a * event_size)
+            spikes_array = file.read((b - a) * event_size)
+
+        spikes = np.frombuffer(spikes_array, Loaders._AEDAT_events_struct(settings))
+        addresses, timestamps = Loaders._decode_AEDAT_events(spikes, settings)
+
+        if aedat_index is not None and len(timestamps) > 0:
+            # The first event read is an entry of the sparse table, whose unwrapped timestamp gives the number of previous overflows
+            timestamp_range = 1 << (8 * settings.timestamp_size)
+            epoch = (int(aedat_index.sparse_timestamps[a // aedat_index.stride]) - int(timestamps[0])) // timestamp_range
+            timestamps, _ = Functions._unwrap_chunk(timestamps, timestamp_range, (None, epoch, None))
+
+            # Trim the strides to the range
+            first = np.searchsorted(timestamps, t_start, side="left")
+            last = np.searchsorted(timestamps, t_end, side="right")
+            addresses = addresses[first:last]
+            timestamps = timestamps[first:last]
+
+        spikes_file = SpikesFile(addresses, timestamps)
+
+        # Check correct address values and increasing timestamp order in the loaded events
+        _, order_is_ok, all_in_range = Functions.check_SpikesFile(spikes_file, settings, mode=validate)
+        if not all_in_range:
+            raise ValueError("Addresses are not in range. Could be due to bad decoding")
+        if not order_is_ok:
+            Functions.order_SpikesFile(spikes_file, settings)
+
+        return spikes_file
+
+    @staticmethod
+    def index_AEDAT(path, settings, stride=1024, chunk_events=1048576):
+        """
+        Builds the index of an AEDAT (.aedat) file and saves it next to the file, with the same name and the .idx extension added.
+
+        The index contains a sparse table of timestamps and byte offsets (one entry every stride events), the number of events of each address, the minimum and maximum timestamps and the number of events of the file.
+
+        Parameters:
+                path (string): Full path of the AEDAT file, including name and extension.
+                settings (MainSettings): Configuration parameters for the file.
+                stride (int, optional): Number of events between two consecutive entries of the sparse table.
+                chunk_events (int, optional): Number of events decoded at once while building the index. It is rounded to a multiple of stride.
+
+        Returns:
+                AEDATIndex: Index of the file.
+
+        Note:
+                The file is read in chunks, so building the index of files larger than the available memory is possible.
+                Timestamps of the index are unwrapped across the whole file (see Functions.unwrap_timestamps), as in loadAEDAT.
+        """
+        event_size = settings.address_size + settings.timestamp_size
+        chunk_events = max(1, chunk_events // stride) * stride
+
+        with open(path, "rb") as file:
+            header_end = Loaders._find_AEDAT_header_end(file)
+
+        num_addresses = settings.num_channels * (settings.on_off_both + 1) * (settings.mono_stereo + 1)
+        address_counts = np.zeros(num_addresses, dtype=np.int64)
+        sparse_timestamps = []
+        num_events = 0
+        min_ts = None
+        max_ts = None
+
+        for chunk in Loaders.iter_AEDAT(path, settings, chunk_events=chunk_events):
+            counts = chunk.address_counts
+            if len(counts) > len(address_counts):
+                address_counts = np.pad(address_counts, (0, len(counts) - len(address_counts)))
+            address_counts[:len(counts)] += counts
+
+            sparse_timestamps.append(chunk.timestamps[::stride].astype(np.int64))
+            min_ts = chunk.min_ts if min_ts is None else min(min_ts, chunk.min_ts)
+            max_ts = chunk.max_ts if max_ts is None else max(max_ts, chunk.max_ts)
+            num_events += len(chunk.timestamps)
+
+        sparse_timestamps = np.concatenate(sparse_timestamps) if sparse_timestamps else np.zeros(0, dtype=np.int64)
+        file_stat = os.stat(path)
+
+        aedat_index = AEDATIndex(num_events=num_events, min_ts=None if min_ts is None else int(min_ts),
+                                 max_ts=None if max_ts is None else int(max_ts), address_counts=address_counts,
+                                 stride=stride, sparse_timestamps=sparse_timestamps,
+                                 sparse_offsets=header_end + np.arange(len(sparse_timestamps), dtype=np.int64) * stride * event_size,
+                                 header_end=header_end, file_size=file_stat.st_size, file_mtime=file_stat.st_mtime_ns,
+                                 address_size=settings.address_size, timestamp_size=settings.timestamp_size,
+                                 duration=(int(max_ts) - int(min_ts)) * settings.ts_tick if num_events > 0 else 0)
+
+        with open(path + ".idx", "wb") as index_file:
+            np.savez(index_file, num_events=num_events,
+                     min_ts=-1 if min_ts is None else min_ts, max_ts=-1 if max_ts is None else max_ts,
+                     address_counts=address_counts, stride=stride,
+                     sparse_timestamps=sparse_timestamps, sparse_offsets=aedat_index.sparse_offsets,
+                     header_end=header_end, file_size=aedat_index.file_size, file_mtime=aedat_index.file_mtime,
+                     address_size=settings.address_size, timestamp_size=settings.timestamp_size)
+
+        return aedat_index
+
+    @staticmethod
+    def load_AEDAT_index(path, settings):
+        """
+        Loads the index of an AEDAT (.aedat) file previously built with index_AEDAT.
+
+        Parameters:
+                path (string): Full path of the AEDAT file (not the index file), including name and extension.
+                settings (MainSettings): Configuration parameters for the file.
+
+        Returns:
+                AEDATIndex: Index of the file, or None if the file has no index or if the index is out of date.
+
+        Note:
+                An index is out of date if the size or the modification time of the file changed after building it, or if it was built with different address_size or timestamp_size settings.
+        """
+        if not os.path.exists(path + ".idx"):
+            return None
+
+        file_stat = os.stat(path)
+        with np.load(path + ".idx") as index_data:
+            if (int(index_data["file_size"]) != file_stat.st_size or int(index_data["file_mtime"]) != file_stat.st_mtime_ns or
+                    int(index_data["address_size"]) != settings.address_size or int(index_data["timestamp_size"]) != settings.timestamp_size):
+                return None
+
+            num_events = int(index_data["num_events"])
+            min_ts = int(index_data["min_ts"]) if num_events > 0 else None
+            max_ts = int(index_data["max_ts"]) if num_events > 0 else None
+            return AEDATIndex(num_events=num_events, min_ts=min_ts, max_ts=max_ts,
+                              duration=(max_ts - min_ts) * settings.ts_tick if num_events > 0 else 0,
+                              address_counts=index_data["address_counts"], stride=int(index_data["stride"]),
+                              sparse_timestamps=index_data["sparse_timestamps"], sparse_offsets=index_data["sparse_offsets"],
+                              header_end=int(index_data["header_end"]), file_size=file_stat.st_size,
+                              file_mtime=file_stat.st_mtime_ns, address_size=settings.address_size,
+                              timestamp_size=settings.timestamp_size)
+
+    @staticmethod
+    def _AEDAT_index_bounds(aedat_index, timestamp, right=False):
+        """
+        Finds the range of events of an AEDAT file where a binary search for timestamp has to look, using the sparse table of its index.
+
+        Parameters:
+                aedat_index (AEDATIndex): Index of the file.
+                timestamp (int): Timestamp to look for.
+                right (boolean, optional): Same as in _bisect_AEDAT.
+
+        Returns:
+                int: Index of the first event of the range.
+                int: Index of the last event of the range plus one.
+        """
+        k = np.searchsorted(aedat_index.sparse_timestamps, timestamp, side="right" if right else "left")
+        lo = max(0, (int(k) - 1) * aedat_index.stride)
+        hi = min(int(k) * aedat_index.stride, aedat_index.num_events)
+        return lo, hi
+
+    @staticmethod
+    def _AEDAT_cache_key(path, settings, validate):
+        """
+        Computes the key used to store the decoded arrays of an AEDAT file in the cache of load_AEDAT_cached.
+
+        The key combines a fingerprint of the file (size, modification time, and its first and last 64 KiB) with the settings and the validation mode that affect the decoded arrays.
+
+        Parameters:
+                path (string): Full path of the AEDAT file, including name and extension.
+                settings (MainSettings): Configuration parameters for the file.
+                validate (string): Validation mode used when loading the file (see Loaders.loadAEDAT).
+
+        Returns:
+                string: Hexadecimal key.
+        """
+        sample_size = 65536
+        file_stat = os.stat(path)
+
+        key = hashlib.sha1()
+        key.update(repr((file_stat.st_size, file_stat.st_mtime_ns, settings.address_size, settings.timestamp_size,
+                         settings.ts_tick, bool(settings.reset_timestamp), settings.num_channels, settings.on_off_both,
+                         settings.mono_stereo, validate)).encode("utf-8"))
+        with open(path, "rb") as file:
+            key.update(file.read(sample_size))
+            if file_stat.st_size > sample_size:
+                file.seek(-sample_size, 2)
+                key.update(file.read(sample_size))
+
+        return key.hexdigest()
+
+    @staticmethod
+    def _evict_AEDAT_cache(cache_dir, max_cache_size):
+        """
+        Removes the least recently used entries of the cache of load_AEDAT_cached until its size is below max_cache_size.
+
+        Parameters:
+                cache_dir (string): Path of the cache folder.
+                max_cache_size (int): Maximum size (in bytes) of the cache folder.
+
+        Returns:
+                None.
+        """
+        entries = {}
+        for file_name in os.listdir(cache_dir):
+            if file_name.endswith("_addresses.npy") or file_name.endswith("_timestamps.npy"):
+                file_stat = os.stat(os.path.join(cache_dir, file_name))
+                key = file_name.rsplit("_", 1)[0]
+                last_use, size = entries.get(key, (0, 0))
+                entries[key] = (max(last_use, file_stat.st_mtime), size + file_stat.st_size)
+
+        total_size = sum(size for _, size in entries.values())
+        for key, (_, size) in sorted(entries.items(), key=lambda entry: entry[1][0]):
+            if total_size <= max_cache_size:
+                break
+            for suffix in ("_addresses.npy", "_timestamps.npy"):
+                try:
+                    os.remove(os.path.join(cache_dir, key + suffix))
+                except OSError:
+                    pass
+            total_size -= size
+
+    @staticmethod
+    def load_AEDAT_cached(path, settings, cache_dir, max_cache_size=10 * 1024 ** 3, validate='full'):
+        """
+        Loads an AEDAT (.aedat) file and adapts its timestamps (see Functions.adapt_timestamps), keeping the result in a cache folder so that later loads of the same file are memory-mapped from the cache instead of decoded again.
+
+        Parameters:
+                path (string): Full path of the AEDAT file to be loaded, including name and extension.
+                settings (MainSettings): Configuration parameters for the file to load.
+                cache_dir (string): Path of the folder where the decoded arrays are cached. It is created if it does not exist.
+                max_cache_size (int, optional): Maximum size (in bytes) of the cache folder. The least recently used files are removed when it is exceeded.
+                validate (string, optional): Same as in loadAEDAT. Each validation mode has its own cache entries.
+
+        Returns:
+                SpikesFile: SpikesFile containing all the addresses and timestamps of the file, with the timestamps already adapted.
+
+        Note:
+                The cached arrays depend on the file, on the validation mode and on the address_size, timestamp_size, ts_tick, reset_timestamp, num_channels, on_off_both and mono_stereo settings. Changing any of them creates a new cache entry.
+                When the file is found in the cache, the arrays of the returned SpikesFile are read-only memory-mapped arrays.
+        """
+        if not os.path.exists(cache_dir):
+            os.makedirs(cache_dir)
+
+        key = Loaders._AEDAT_cache_key(path, settings, validate)
+        addresses_path = os.path.join(cache_dir, key + "_addresses.npy")
+        timestamps_path = os.path.join(cache_dir, key + "_timestamps.npy")
+
+        if os.path.exists(addresses_path) and os.path.exists(timestamps_path):
+            # Mark the entry as recently used
+            os.utime(addresses_path)
+            os.utime(timestamps_path)
+            return SpikesFile(np.load(addresses_path, mmap_mode="r"), np.load(timestamps_path, mmap_mode="r"))
+
+        spikes_file = Loaders.loadAEDAT(path, settings, validate=validate)
+        # The loaded arrays are not shared with anyone yet
+        Functions.adapt_timestamps(spikes_file, settings, inplace=True)
+
+        # Write to temporary files first, so that concurrent loads never see incomplete entries
+        for array, array_path in ((spikes_file.addresses, addresses_path), (spikes_file.timestamps, timestamps_path)):
+            temp_path = array_path + "." + str(os.getpid()) + ".tmp"
+            with open(temp_path, "wb") as array_file:
+                np.save(array_file, np.asarray(array))
+            os.replace(temp_path, array_path)
+
+        Loaders._evict_AEDAT_cache(cache_dir, max_cache_size)
+
+        return spikes_file
+
     # TODO: Check the rest of loading functions
 
+    @staticmethod
+    def _load_AEDAT_to_temp(path, settings, temp_dir, validate):
+        """
+        Loads an AEDAT file and saves its addresses and timestamps as .npy files in temp_dir. Used by the worker processes of load_many.
+
+        Parameters:
+                path (string): Full path of the AEDAT file to be loaded, including name and extension.
+                settings (MainSettings): Configuration parameters for the file to load.
+                temp_dir (string): Folder where the arrays are saved.
+                validate (string): Same as in loadAEDAT.
+
+        Returns:
+                string: Path of the .npy file with the addresses.
+                string: Path of the .npy file with the timestamps.
+        """
+        spikes_file = Loaders.loadAEDAT(path, settings, validate=validate)
+
+        base_path = os.path.join(temp_dir, uuid.uuid4().hex)
+        np.save(base_path + "_addresses.npy", np.asarray(spikes_file.addresses))
+        np.save(base_path + "_timestamps.npy", np.asarray(spikes_file.timestamps))
+        return base_path + "_addresses.npy", base_path + "_timestamps.npy"
+
+    @staticmethod
+    def _remove_temp_file(path, temp_dir):
+        """
+        Removes a temporary file of load_many, and its folder if it is empty. Called when the array mapped to the file is no longer used.
+
+        Parameters:
+                path (string): Path of the temporary file.
+                temp_dir (string): Folder of the temporary file.
+
+        Returns:
+                None.
+        """
+        for remove, remove_path in ((os.remove, path), (os.rmdir, temp_dir)):
+            try:
+                remove(remove_path)
+            except OSError:
+                pass
+
+    @staticmethod
+    def load_many(paths, settings, workers=None, ordered=True, validate='full'):
+        """
+        Loads several AEDAT (.aedat) files in parallel, using a pool of processes.
+
+        Parameters:
+                paths (string[]): Full paths of the AEDAT files to be loaded, including name and extension.
+                settings (MainSettings): Configuration parameters for the files to load.
+                workers (int, optional): Number of worker processes. If None, the number of processors of the machine is used.
+                ordered (boolean, optional): If True, files are returned in the same order as in paths. If False, files are returned as soon as they are loaded.
+                validate (string, optional): Same as in loadAEDAT.
+
+        Returns:
+                generator: Generator of (path, SpikesFile) tuples.
+
+        Note:
+                Decoded arrays are handed back from the worker processes through temporary .npy files instead of being pickled or copied.
+                The arrays of the returned SpikesFiles are read-only memory-mapped views of those files, which are removed once the arrays are no longer used.
+        """
+        temp_dir = tempfile.mkdtemp(prefix="pyNAVIS_")
+        executor = ProcessPoolExecutor(max_workers=workers)
+        try:
+            futures = {executor.submit(Loaders._load_AEDAT_to_temp, path, settings, temp_dir, validate): path for path in paths}
+
+            for future in (futures if ordered else as_completed(futures)):
+                addresses_path, timestamps_path = future.result()
+                addresses = np.load(addresses_path, mmap_mode="r")
+                timestamps = np.load(timestamps_path, mmap_mode="r")
+                weakref.finalize(addresses, Loaders._remove_temp_file, addresses_path, temp_dir)
+                weakref.finalize(timestamps, Loaders._remove_temp_file, timestamps_path, temp_dir)
+                yield futures[future], SpikesFile(addresses, timestamps)
+        finally:
+            executor.shutdown(wait=True, cancel_futures=True)
+            # Files that cannot be removed while they are mapped (e.g. on Windows) are removed by their finalizers
+            shutil.rmtree(temp_dir, ignore_errors=True)
+
+    @staticmethod
+    def loadNPZ(path, t_start=None, t_end=None, return_settings=False):
+        """
+        Loads a compressed NumPy (.npz) file saved with Savers.save_NPZ.
+
+        Parameters:
+                path (string): Full path of the NPZ file to be loaded, including name and extension.
+                t_start (int, optional): If set, only events whose timestamp is greater than or equal to t_start are loaded.
+                t_end (int, optional): If set, only events whose timestamp is less than or equal to t_end are loaded.
+                return_settings (boolean, optional): Set to True to also return the settings stored in the file.
+
+        Returns:
+                SpikesFile: SpikesFile containing the addresses and timestamps of the file.
+                MainSettings: Configuration parameters stored in the file. Only returned if return_settings is set to True.
+
+        Note:
+                Blocks of the file whose timestamps are outside the range [t_start, t_end] are not decompressed.
+        """
+        with np.load(path) as npz_file:
+            num_blocks = int(npz_file["num_blocks"])
+            block_min_ts = npz_file["block_min_ts"]
+            block_max_ts = npz_file["block_max_ts"]
+            block_first_ts = npz_file["block_first_ts"]
+            # Files saved before fractional timestamps were supported do not have this flag
+            float_timestamps = "float_timestamps" in npz_file.files and bool(npz_file["float_timestamps"])
+
+            # Select the blocks that overlap the requested range
+            selected_blocks = np.ones(num_blocks, dtype=bool)
+            if t_start is not None:
+                selected_blocks &= block_max_ts >= t_start
+            if t_end is not None:
+                selected_blocks &= block_min_ts <= t_end
+
+            addresses = []
+            timestamps = []
+            for i in np.flatnonzero(selected_blocks):
+                block_addresses = npz_file["addresses_" + str(i)]
+                if float_timestamps:
+                    block_timestamps = npz_file["timestamps_" + str(i)]
+                else:
+                    # Undo the delta encoding
+                    block_timestamps = block_first_ts[i] + np.cumsum(npz_file["timestamps_" + str(i)], dtype=np.int64)
+
+                in_range = np.ones(len(block_timestamps), dtype=bool)
+                if t_start is not None:
+                    in_range &= block_timestamps >= t_start
+                if t_end is not None:
+                    in_range &= block_timestamps <= t_end
+                addresses.append(block_addresses[in_range])
+                timestamps.append(block_timestamps[in_range])
+
+            spikes_file = SpikesFile(np.concatenate(addresses) if addresses else np.zeros(0, dtype=np.uint16),
+                                     np.concatenate(timestamps) if timestamps else np.zeros(0, dtype=np.int64))
+
+            if return_settings:
+                settings = MainSettings(num_channels=int(npz_file["num_channels"]), mono_stereo=int(npz_file["mono_stereo"]),
+                                        address_size=int(npz_file["address_size"]), timestamp_size=int(npz_file["timestamp_size"]),
+                                        ts_tick=npz_file["ts_tick"].item(), bin_size=npz_file["bin_size"].item(),
+                                        on_off_both=int(npz_file["on_off_both"]), reset_timestamp=bool(npz_file["reset_timestamp"]))
+                return spikes_file, settings
+
+        return spikes_file
+
     @staticmethod
     def loadAEDATLocalization(path, settings, localization_settings):
         """
@@ -123,14 +763,11 @@ class Loaders:
                 SettingsError: If settings.address_size is different than 2 and 4.
 
         """
-        unpack_param = ">H"
-
-        if settings.address_size == 2:
-            unpack_param = ">H"
-        elif settings.address_size == 4:
-            unpack_param = ">L"
+        if settings.address_size == 2 or settings.address_size == 4:
+            address_param = ">u" + str(settings.address_size)
         else:
             print("[Loaders.loadAEDATLocalization] > SettingsError: Only address sizes implemented are 2 and 4 bytes")
+            return None
 
         # Check the localization_settings values
         localization_settings_error = False
@@ -168,148 +805,157 @@ class Loaders:
         if(localization_settings_error):
             return None
 
+        event_size = settings.address_size + 4
+
         with open(path, 'rb') as f:
             ## Check header ##
-            p = 0
-            lt = f.readline()
-            while lt and lt[0] == ord("#"):
-                p += len(lt)
-                lt = f.readline()
-            f.seek(p)
+            p = Loaders._find_AEDAT_header_end(f)
 
             f.seek(0, 2)
             eof = f.tell()
 
-            num_events = math.floor((eof-p)/(settings.address_size + 4))
+            num_events = math.floor((eof-p)/event_size)
 
+            ## Read file ##
             f.seek(p)
+            file_data = f.read(num_events * event_size)
+
+        events_struct = np.dtype([("events", address_param), ("timestamps", ">u4")])
+        events = np.frombuffer(file_data, events_struct)
+        ev = events["events"].astype(np.uint32)
+        ts = events["timestamps"].astype(np.uint32)
+        total_number_events_counter = len(ev)
+
+        # Check if the event is a NAS event of SOC event
+        nas_events = ((ev & 0x8000) >> 15) == 0
+
+        # Apply a mask to obtain the correct values of the localization events and check them
+        neuron_ids = (ev & 0x3E00) >> 9
+        freq_channels = (ev & 0x00FE) >> 1
+        valid_localization_data = ((neuron_ids < localization_settings.mso_num_neurons_channel) &
+                                   (freq_channels >= localization_settings.mso_start_channel) &
+                                   (freq_channels <= localization_settings.mso_end_channel))
+
+        # MSO events (xso_type = 0) are only kept if they are valid, while LSO events (xso_type = 1) are always kept
+        lso_events = ((ev & 0x4000) >> 14) == 1
+        mso_events = ~nas_events & ~lso_events
+        lso_events &= ~nas_events
+        invalid_localization_data_counter = np.count_nonzero(mso_events & ~valid_localization_data)
+        mso_events &= valid_localization_data
 
-            events_nas = []
-            timestamps_nas = []
-
-            neuron_ids_mso = []
-            channels_mso =  []
-            timestamps_mso = []
-
-            neuron_ids_lso = []
-            channels_lso =  []
-            timestamps_lso = []
-
-            ## Read file ##
-            i = 0
-            total_number_events_counter = 0
-            invalid_localization_data_counter = 0
-            try:
-                while 1:
-                    # Read a word and unpack the event data
-                    buff = f.read(settings.address_size)
-                    ev = struct.unpack(unpack_param, buff)[0]
-                    total_number_events_counter = total_number_events_counter + 1
-                    # Read a word and unpack the event timestamp
-                    buff = f.read(4)
-                    ts = struct.unpack('>L', buff)[0]
-
-                    # Check if the event is a NAS event of SOC event
-                    auditory_model = (ev & 0x8000) >> 15
-
-                    if auditory_model == 0:
-                        # NAS event
-                        events_nas.append(ev)
-                        timestamps_nas.append(ts)
-                    elif auditory_model == 1:
-                        # Localization event
-
-                        # Set the valid data flag to true
-                        valid_localization_data = True
-
-                        # Apply a mask to obtain the correct values and check them
-                        neuron_id = (ev & 0x3E00) >> 9
-                        if neuron_id < 0 or neuron_id >= localization_settings.mso_num_neurons_channel:
-                            valid_localization_data = False
-                        freq_channel = (ev & 0x00FE) >> 1
-                        if freq_channel < localization_settings.mso_start_channel or freq_channel > localization_settings.mso_end_channel:
-                            valid_localization_data = False
-
-                        xso_type = (ev & 0x4000) >> 14
-
-                        if xso_type == 0:
-                            # MSO event
-                            if valid_localization_data:
-                                neuron_ids_mso.append(neuron_id)
-                                channels_mso.append(freq_channel)
-                                timestamps_mso.append(ts)
-                            else:
-                                invalid_localization_data_counter = invalid_localization_data_counter + 1
-                        elif xso_type == 1:
-                            # LSO event
-                            neuron_ids_lso.append(neuron_id)
-                            channels_lso.append(freq_channel)
-                            timestamps_lso.append(ts)
-                        else:
-                            # Other case
-                            print("[Loaders.loadAEDATLocalization] > DataError: MSO/LSO type not recognized!")
-                    else:
-                        # Other case
-                        print("[Loaders.loadAEDATLocalization] > DataError: Auditory model not recognized!")
-
-                    i += 1
-            except Exception as inst:
-                pass
         spikes_file = SpikesFile([], [])
-        spikes_file.addresses = events_nas
-        spikes_file.timestamps = timestamps_nas
+        spikes_file.addresses = ev[nas_events]
+        spikes_file.timestamps = ts[nas_events]
 
         localization_file = LocalizationFile([], [], [], [], [], [])
-        localization_file.mso_neuron_ids = neuron_ids_mso
-        localization_file.mso_channels = channels_mso
-        localization_file.mso_timestamps = timestamps_mso
-        localization_file.lso_neuron_ids = neuron_ids_lso
-        localization_file.lso_channels = channels_lso
-        localization_file.lso_timestamps = timestamps_lso
+        localization_file.mso_neuron_ids = neuron_ids[mso_events]
+        localization_file.mso_channels = freq_channels[mso_events]
+        localization_file.mso_timestamps = ts[mso_events]
+        localization_file.lso_neuron_ids = neuron_ids[lso_events]
+        localization_file.lso_channels = freq_channels[lso_events]
+        localization_file.lso_timestamps = ts[lso_events]
         # Let the user know if there were dumped events
         if invalid_localization_data_counter > 0:
             print("[Loaders.loadAEDATLocalization] > DataWarning: " + str(invalid_localization_data_counter) + " of " + str(total_number_events_counter) + " were dumped due to invalid unpacked data!")
         return spikes_file, localization_file
 
     @staticmethod
-    def loadCSV(path, delimiter=','):
+    def _read_CSV_blocks(path, delimiter, chunk_rows, num_columns):
+        """
+        Parses a CSV file in blocks of rows, converting each block into a NumPy array at once.
+
+        Parameters:
+                path (string): Full path of the CSV file to be loaded, including name and extension.
+                delimiter (char): Delimiter used in the CSV file.
+                chunk_rows (int): Maximum number of rows of each block.
+                num_columns (int): Number of columns to parse. Extra columns are ignored, and missing columns are filled with 0.
+
+        Returns:
+                generator: Generator of (rows, picoseconds) tuples, where rows is a 2D int64 array with num_columns columns and one row per line of the block, and picoseconds is a boolean array that is True for the lines whose timestamp contained the "ps" unit.
+        """
+        with open(path) as csv_file:
+            while True:
+                lines = list(itertools.islice(csv_file, chunk_rows))
+                if not lines:
+                    break
+                lines = [line for line in lines if line.strip()]
+                if not lines:
+                    continue
+
+                # Remove the time reference (from simulation) of the lines that have it
+                picoseconds = np.array(["ps" in line for line in lines], dtype=bool)
+                if picoseconds.any():
+                    lines = [line.replace("ps", "") for line in lines]
+
+                # Lines with fewer columns (e.g. NAS events mixed with SOC events) are filled with zeros
+                if min(line.count(delimiter) for line in lines) < num_columns - 1:
+                    lines = [line.rstrip("\r\n") + (delimiter + "0") * max(0, num_columns - 1 - line.count(delimiter)) + "\n" for line in lines]
+
+                rows = np.loadtxt(io.StringIO("".join(lines)), delimiter=delimiter, dtype=np.int64, ndmin=2, usecols=range(num_columns))
+                yield rows, picoseconds
+
+    @staticmethod
+    def loadCSV(path, delimiter=',', chunk_rows=1000000):
         """
         Loads a Comma-Separated Values (.csv) file.
         
         Parameters:
                 path (string): Full path of the CSV file to be loaded, including name and extension.
                 delimiter (char): Delimiter to use in the CSV file.
+                chunk_rows (int, optional): Number of lines parsed at once. Only affects the memory used while parsing.
 
         Returns:
                 SpikesFile: SpikesFile containing all the addresses and timestamps of the file.
 
         Note:
-                The CSV file should contain one line per event, and the information in each line should be: address, timestamp
+                The CSV file should contain one line per event, and the information in each line should be: address, timestamp. Any other column is ignored.
+
+                Timestamps with the "ps" unit (from simulation) are converted from picoseconds to microseconds, as in loadCSVLocalization.
 
         """
         addresses = []
         timestamps = []
 
-
-        with open(path) as csv_file:
-            csv_reader = csv.reader(csv_file, delimiter=delimiter)
-            for row in csv_reader:
-                addresses.append(int(row[0]))
-                timestamps.append(int(row[1]))
+        for rows, picoseconds in Loaders._read_CSV_blocks(path, delimiter, chunk_rows, 2):
+            addresses.append(rows[:, 0])
+            # Convert the timestamps from picoseconds to microseconds
+            timestamps.append(np.where(picoseconds, rows[:, 1] // 1000000, rows[:, 1]))
 
         spikes_file = SpikesFile([], [])
-        spikes_file.addresses = addresses
-        spikes_file.timestamps = timestamps
+        spikes_file.addresses = np.concatenate(addresses) if addresses else np.zeros(0, dtype=np.int64)
+        spikes_file.timestamps = np.concatenate(timestamps) if timestamps else np.zeros(0, dtype=np.int64)
         return spikes_file
 
     @staticmethod
-    def loadCSVLocalization(path, delimiter=','):
+    def iter_CSV(path, delimiter=',', chunk_rows=1000000):
+        """
+        Reads a Comma-Separated Values (.csv) file in chunks, yielding a SpikesFile for each block of consecutive lines.
+
+        Parameters:
+                path (string): Full path of the CSV file to be loaded, including name and extension.
+                delimiter (char): Delimiter to use in the CSV file.
+                chunk_rows (int, optional): Maximum number of events contained in each chunk.
+
+        Returns:
+                generator: Generator of SpikesFile objects, each one containing up to chunk_rows events of the file, in file order.
+
+        Note:
+                The CSV file should follow the same format as in loadCSV, and timestamps with the "ps" unit are converted to microseconds too.
+                Only one chunk is kept in memory at a time, so files larger than the available memory can be processed.
+        """
+        for rows, picoseconds in Loaders._read_CSV_blocks(path, delimiter, chunk_rows, 2):
+            # Convert the timestamps from picoseconds to microseconds
+            yield SpikesFile(rows[:, 0], np.where(picoseconds, rows[:, 1] // 1000000, rows[:, 1]))
+
+    @staticmethod
+    def loadCSVLocalization(path, delimiter=',', chunk_rows=1000000):
         """
         Loads a Comma-Separated Values (.csv) file which contains events from both the NAS model and the SOC model (sound source localization).
         
         Parameters:
                 path (string): Full path of the CSV file to be loaded, including name and extension.
                 delimiter (char): Delimiter to use in the CSV file.
+                chunk_rows (int, optional): Number of lines parsed at once. Only affects the memory used while parsing.
 
         Returns:
                 SpikesFile: SpikesFile containing all the addresses and timestamps of the file.
@@ -320,6 +966,10 @@ class Loaders:
 
                 The CSV format should be: address, timestamp, auditory_model, xso_type, neuron_id.
 
+                Lines with only the address and timestamp columns are loaded as NAS events, and they can be mixed with lines with all the columns.
+
+                Timestamps with the "ps" unit (from simulation) are converted from picoseconds to microseconds, line by line.
+
         """
         addresses_nas = []
         timestamps_nas = []
@@ -332,66 +982,64 @@ class Loaders:
         channels_lso =  []
         timestamps_lso = []
 
+        unknown_auditory_model = False
+        unknown_xso_type = False
+
+        for rows, picoseconds in Loaders._read_CSV_blocks(path, delimiter, chunk_rows, 5):
+            addresses = rows[:, 0]
+            timestamps = rows[:, 1]
+            auditory_models = rows[:, 2]
+
+            # NAS event
+            nas_events = auditory_models == 0
+            addresses_nas.append(addresses[nas_events])
+            if picoseconds.any():
+                # Convert the timestamps from picoseconds to microseconds
+                timestamps_nas.append(np.where(picoseconds, timestamps // 1000000, timestamps)[nas_events])
+                timestamps = np.where(picoseconds, timestamps * 1.0e-6, timestamps)
+            else:
+                timestamps_nas.append(timestamps[nas_events])
 
-        with open(path) as csv_file:
-            csv_reader = csv.reader(csv_file, delimiter=delimiter)
-            for row in csv_reader:
+            # Localization event
+            localization_events = auditory_models == 1
+            if np.any(localization_events):
+                xso_types = rows[:, 3]
+                neuron_ids = rows[:, 4]
 
-                try:
-                    auditory_model = int(row[2])
-                except Exception:
-                    auditory_model = 0
-                    pass
+                freq_channels = addresses #>> 1
+                mso_events = localization_events & (xso_types == 0)
+                lso_events = localization_events & (xso_types == 1)
 
-                address = int(row[0])
-                timestamp = row[1]
-
-                # Check if the timestamp contains any time reference (from simulation)
-                timeref = "ps"
-                if timeref in timestamp:
-                    # Remove string "ps" and convert the timestamps from picoseconds to microseconds
-                    timestamp = timestamp.replace(" ps", "")
-                    timestamp = int(timestamp)
-                    timestamp = timestamp * 1.0e-6
-
-                if auditory_model == 0:
-                    # NAS event
-                    addresses_nas.append(address)
-                    timestamps_nas.append(int(timestamp))
-                elif auditory_model == 1:
-                    # Localization event
-                    xso_type = int(row[3])
-                    neuron_id = int(row[4])
-
-                    freq_channel = address #>> 1
-                    if xso_type == 0:
-                        # MSO event
-                        neuron_ids_mso.append(neuron_id)
-                        channels_mso.append(freq_channel)
-                        timestamps_mso.append(timestamp)
-                    elif xso_type == 1:
-                        # LSO event
-                        neuron_ids_lso.append(neuron_id)
-                        channels_lso.append(freq_channel)
-                        timestamps_lso.append(timestamp)
-                    else:
-                        # Other case
-                        print("[Loaders.loadCSVLocalization] > DataError: MSO/LSO type not recognized!")
-                else:
-                    # Other case
-                    print("[Loaders.loadCSVLocalization] > DataError: Auditory model not recognized!")
+                # MSO event
+                neuron_ids_mso.append(neuron_ids[mso_events])
+                channels_mso.append(freq_channels[mso_events])
+                timestamps_mso.append(timestamps[mso_events])
+
+                # LSO event
+                neuron_ids_lso.append(neuron_ids[lso_events])
+                channels_lso.append(freq_channels[lso_events])
+                timestamps_lso.append(timestamps[lso_events])
+
+                unknown_xso_type |= bool(np.any(localization_events & ~mso_events & ~lso_events))
+
+            unknown_auditory_model |= bool(np.any(~nas_events & ~localization_events))
+
+        if unknown_xso_type:
+            print("[Loaders.loadCSVLocalization] > DataError: MSO/LSO type not recognized!")
+        if unknown_auditory_model:
+            print("[Loaders.loadCSVLocalization] > DataError: Auditory model not recognized!")
 
         spikes_file = SpikesFile([], [])
-        spikes_file.addresses = addresses_nas
-        spikes_file.timestamps = timestamps_nas
+        spikes_file.addresses = np.concatenate(addresses_nas) if addresses_nas else np.zeros(0, dtype=np.int64)
+        spikes_file.timestamps = np.concatenate(timestamps_nas) if timestamps_nas else np.zeros(0, dtype=np.int64)
 
         localization_file = LocalizationFile([], [], [], [], [], [])
-        localization_file.mso_neuron_ids = neuron_ids_mso
-        localization_file.mso_channels = channels_mso
-        localization_file.mso_timestamps = timestamps_mso
-        localization_file.lso_neuron_ids = neuron_ids_lso
-        localization_file.lso_channels = channels_lso
-        localization_file.lso_timestamps = timestamps_lso
+        localization_file.mso_neuron_ids = np.concatenate(neuron_ids_mso) if neuron_ids_mso else np.zeros(0, dtype=np.int64)
+        localization_file.mso_channels = np.concatenate(channels_mso) if channels_mso else np.zeros(0, dtype=np.int64)
+        localization_file.mso_timestamps = np.concatenate(timestamps_mso) if timestamps_mso else np.zeros(0, dtype=np.int64)
+        localization_file.lso_neuron_ids = np.concatenate(neuron_ids_lso) if neuron_ids_lso else np.zeros(0, dtype=np.int64)
+        localization_file.lso_channels = np.concatenate(channels_lso) if channels_lso else np.zeros(0, dtype=np.int64)
+        localization_file.lso_timestamps = np.concatenate(timestamps_lso) if timestamps_lso else np.zeros(0, dtype=np.int64)
 
         return spikes_file, localization_file
 
@@ -410,68 +1058,43 @@ class Loaders:
                 localization_file: LocalizationFile containing all the events from both the MSO and LSO models of the file.
         """
 
-        addresses = []
-        timestamps = []
-
-        neuron_ids_mso = []
-        channels_mso =  []
-        timestamps_mso = []
-
-        neuron_ids_lso = []
-        channels_lso =  []
-        timestamps_lso = []
-
-        txt_file = open(path, 'r')
-        txt_lines = txt_file.readlines()
-
-        count = 0
-        for line in txt_lines:
-            event = line.strip().split(',')
-            decoded_events_timestamps      = float(event[0])
-            decoded_events_auditory_models = int(event[1])           # 0 if the event comes from the NAS, 1 for the SOC model
-            decoded_events_channels        = int(event[2])           # 0 left, 1 right
-            decoded_events_xso_types       = int(event[3])           # 0 for MSO, 1 for LSO
-            decoded_events_neuron_ids      = int(event[4])           # Between 0 and 15
-            decoded_events_freq_ch_addrs   = int(event[5])           # Between 0 and 32
-            decoded_events_polarities      = int(event[6])           # 0 pos, 1 neg
-
-            # It could be either NAS (auditory_models = 0) or SOC events (auditory_models = 1)
-            if decoded_events_auditory_models == 0:
-                # NAS event
-                timestamps.append(int(decoded_events_timestamps))
-                addresses.append(int(decoded_events_freq_ch_addrs*(1+settings.on_off_both) + decoded_events_polarities +  settings.num_channels*decoded_events_channels*(1+settings.on_off_both)))
-
-            elif decoded_events_auditory_models == 1:
-                # It could be either MSO (xso_type = 0) or LSO events (xso_type = 1)
-                if decoded_events_xso_types == 0:
-                    # MSO event
-                    timestamps_mso.append(int(decoded_events_timestamps))
-                    channels_mso.append(int(decoded_events_freq_ch_addrs))
-                    neuron_ids_mso.append(int(decoded_events_neuron_ids))
-
-                elif decoded_events_xso_types == 1:
-                    # LSO event
-                    timestamps_lso.append(int(decoded_events_timestamps))
-                    channels_lso.append(int(decoded_events_freq_ch_addrs))
-                    neuron_ids_lso.append(int(decoded_events_neuron_ids))
-                else:
-                    # Other case
-                    print("[Loaders.loadZynqGrabberData] > DataError: MSO/LSO type not recognized!")
-
-            else:
-                # Other case
-                print("[Loaders.loadZynqGrabberData] > DataError: Auditory model not recognized!")
+        # Parse all the decoded events at once
+        events = np.loadtxt(path, delimiter=',', dtype=np.float64, ndmin=2).reshape(-1, 7)
+        decoded_events_timestamps      = events[:, 0].astype(np.int64)
+        decoded_events_auditory_models = events[:, 1].astype(np.int64)     # 0 if the event comes from the NAS, 1 for the SOC model
+        decoded_events_channels        = events[:, 2].astype(np.int64)     # 0 left, 1 right
+        decoded_events_xso_types       = events[:, 3].astype(np.int64)     # 0 for MSO, 1 for LSO
+        decoded_events_neuron_ids      = events[:, 4].astype(np.int64)     # Between 0 and 15
+        decoded_events_freq_ch_addrs   = events[:, 5].astype(np.int64)     # Between 0 and 32
+        decoded_events_polarities      = events[:, 6].astype(np.int64)     # 0 pos, 1 neg
+
+        # It could be either NAS (auditory_models = 0) or SOC events (auditory_models = 1)
+        nas_events = decoded_events_auditory_models == 0
+        soc_events = decoded_events_auditory_models == 1
+
+        # It could be either MSO (xso_type = 0) or LSO events (xso_type = 1)
+        mso_events = soc_events & (decoded_events_xso_types == 0)
+        lso_events = soc_events & (decoded_events_xso_types == 1)
+
+        if np.any(soc_events & ~mso_events & ~lso_events):
+            print("[Loaders.loadZynqGrabberData] > DataError: MSO/LSO type not recognized!")
+        if np.any(~nas_events & ~soc_events):
+            print("[Loaders.loadZynqGrabberData] > DataError: Auditory model not recognized!")
+
+        # NAS event
+        addresses = (decoded_events_freq_ch_addrs[nas_events]*(1+settings.on_off_both) + decoded_events_polarities[nas_events] +
+                     settings.num_channels*decoded_events_channels[nas_events]*(1+settings.on_off_both))
 
         spikes_file = SpikesFile([], [])
         spikes_file.addresses = addresses
-        spikes_file.timestamps = timestamps
+        spikes_file.timestamps = decoded_events_timestamps[nas_events]
 
         localization_file = LocalizationFile([], [], [], [], [], [])
-        localization_file.mso_neuron_ids = neuron_ids_mso
-        localization_file.mso_channels = channels_mso
-        localization_file.mso_timestamps = timestamps_mso
-        localization_file.lso_neuron_ids = neuron_ids_lso
-        localization_file.lso_channels = channels_lso
-        localization_file.lso_timestamps = timestamps_lso
+        localization_file.mso_neuron_ids = decoded_events_neuron_ids[mso_events]
+        localization_file.mso_channels = decoded_events_freq_ch_addrs[mso_events]
+        localization_file.mso_timestamps = decoded_events_timestamps[mso_events]
+        localization_file.lso_neuron_ids = decoded_events_neuron_ids[lso_events]
+        localization_file.lso_channels = decoded_events_freq_ch_addrs[lso_events]
+        localization_file.lso_timestamps = decoded_events_timestamps[lso_events]
 
         return spikes_file, localization_file
\ No newline at end of file
@@ -1,3 +1,6 @@
+import math
+import mmap
+
 import numpy as np
 
 
@@ -10,21 +13,437 @@ class SpikesFile:
             addresses (int[]): Addresses of the file.
     Note:
             Timestamps and addresses are matched, which means that timestamps[0] is the timestamp for the spike with address addresses[0].
+
+            Addresses and timestamps are always stored as contiguous native-endian NumPy arrays with compact dtypes: uint16 (or uint32 if needed) for addresses and uint32 (or uint64 if needed) for timestamps. Signed dtypes are only used if there are negative values.
+            Memory-mapped arrays (see Loaders.loadAEDAT), and views of them, are kept as they are, so that they are not loaded into memory.
+
+            Use append and extend to add events, instead of modifying the arrays.
+
+            min_ts, max_ts, min_ts_index, max_ts_index, duration, address_counts, event_rate, is_sorted and address_index are computed the first time they are read and cached until the addresses or the timestamps change.
     """
 
+    __slots__ = ('_addresses', '_timestamps', '_addresses_buffer', '_timestamps_buffer', '_stats')
+
     def __init__(self, addresses=[], timestamps=[]):
         self.addresses = addresses
         self.timestamps = timestamps
-        if len(timestamps) > 0:
-            self.max_ts_index = np.argmax(timestamps)
-            self.max_ts = timestamps[self.max_ts_index]
-            self.min_ts_index = np.argmin(timestamps)
-            self.min_ts = timestamps[self.min_ts_index]
+
+    @staticmethod
+    def _is_memory_mapped(values):
+        """
+        Checks if an array is a memory-mapped array or a view of one (e.g. the result of numpy.asarray or slicing over a numpy.memmap).
+
+        Parameters:
+                values (object): Array to check.
+
+        Returns:
+                boolean: True if the data of the array is memory-mapped.
+        """
+        while isinstance(values, np.ndarray):
+            if isinstance(values, np.memmap):
+                return True
+            values = values.base
+        return isinstance(values, mmap.mmap)
+
+    @staticmethod
+    def _as_compact_array(values, small_dtype, large_dtype):
+        """
+        Converts a list or array of integers into a contiguous native-endian NumPy array with the smallest of two dtypes that fits its values.
+
+        Parameters:
+                values (int[]): Values to convert.
+                small_dtype (numpy.dtype): Unsigned dtype used if it fits all the values.
+                large_dtype (numpy.dtype): Unsigned dtype used otherwise.
+
+        Returns:
+                numpy.ndarray: Converted array. A signed dtype is used if there are negative values, and float64 is used if there are values with a fractional part.
+        """
+        if SpikesFile._is_memory_mapped(values):
+            return values
+
+        values = np.asarray(values)
+        if values.dtype.kind == 'f':
+            # Fractional values (e.g. timestamps of CSV files in picoseconds converted to microseconds) are not truncated
+            if not np.array_equal(values, np.floor(values)):
+                return np.ascontiguousarray(values, dtype=np.float64)
+            values = values.astype(np.int64)
+
+        if values.size == 0:
+            return np.zeros(0, dtype=small_dtype)
+
+        if values.dtype.kind in 'ub' and values.dtype.itemsize <= np.dtype(small_dtype).itemsize:
+            dtype = small_dtype
+        elif values.dtype == np.dtype(large_dtype):
+            # Already a valid dtype, so views (e.g. from time_slice) are not copied or scanned
+            dtype = large_dtype
+        elif values.dtype.kind == 'u' and values.dtype.itemsize <= np.dtype(large_dtype).itemsize:
+            dtype = small_dtype if values.max() <= np.iinfo(small_dtype).max else large_dtype
         else:
-            self.max_ts_index = None
-            self.max_ts = None
-            self.min_ts_index = None
-            self.min_ts = None
+            min_value = values.min()
+            max_value = values.max()
+            if min_value < 0:
+                dtype = np.int64 if max_value > np.iinfo(np.int32).max or min_value < np.iinfo(np.int32).min else np.int32
+            elif max_value <= np.iinfo(small_dtype).max:
+                dtype = small_dtype
+            elif max_value <= np.iinfo(large_dtype).max:
+                dtype = large_dtype
+            else:
+                dtype = np.uint64
+
+        return np.ascontiguousarray(values, dtype=dtype)
+
+    @property
+    def addresses(self):
+        return self._addresses
+
+    @addresses.setter
+    def addresses(self, addresses):
+        self._addresses = SpikesFile._as_compact_array(addresses, np.uint16, np.uint32)
+        self._addresses_buffer = None
+        self._stats = {}
+
+    @property
+    def timestamps(self):
+        return self._timestamps
+
+    @timestamps.setter
+    def timestamps(self, timestamps):
+        self._timestamps = SpikesFile._as_compact_array(timestamps, np.uint32, np.uint64)
+        self._timestamps_buffer = None
+        self._stats = {}
+
+    def _cached(self, name, compute):
+        """
+        Returns the cached value of a statistic, computing it first if needed.
+
+        Parameters:
+                name (string): Name of the statistic.
+                compute (function): Function (without parameters) that computes the statistic.
+
+        Returns:
+                Value of the statistic.
+        """
+        if name not in self._stats:
+            self._stats[name] = compute()
+        return self._stats[name]
+
+    @property
+    def is_sorted(self):
+        """
+        bool: True if the timestamps are in non-decreasing order.
+        """
+        return self._cached('is_sorted', lambda: bool(np.all(self._timestamps[1:] >= self._timestamps[:-1])))
+
+    @property
+    def min_ts_index(self):
+        """
+        int: Index of the first spike with the smallest timestamp. None if the SpikesFile is empty.
+        """
+        if len(self._timestamps) == 0:
+            return None
+        if self.is_sorted:
+            return 0
+        return self._cached('min_ts_index', lambda: int(np.argmin(self._timestamps)))
+
+    @property
+    def max_ts_index(self):
+        """
+        int: Index of the first spike with the largest timestamp. None if the SpikesFile is empty.
+        """
+        if len(self._timestamps) == 0:
+            return None
+        if self.is_sorted:
+            return self._cached('max_ts_index', lambda: int(np.searchsorted(self._timestamps, self._timestamps[-1], side='left')))
+        return self._cached('max_ts_index', lambda: int(np.argmax(self._timestamps)))
+
+    @property
+    def min_ts(self):
+        """
+        int: Smallest timestamp. None if the SpikesFile is empty.
+        """
+        if len(self._timestamps) == 0:
+            return None
+        return self._timestamps[self.min_ts_index]
+
+    @property
+    def max_ts(self):
+        """
+        int: Largest timestamp. None if the SpikesFile is empty.
+        """
+        if len(self._timestamps) == 0:
+            return None
+        return self._timestamps[self.max_ts_index]
+
+    @property
+    def duration(self):
+        """
+        int: Difference between the largest and the smallest timestamps. None if the SpikesFile is empty.
+        """
+        if len(self._timestamps) == 0:
+            return None
+        return int(self.max_ts) - int(self.min_ts)
+
+    @property
+    def address_counts(self):
+        """
+        int[]: Number of spikes of each address, from address 0 to the largest address of the SpikesFile.
+        """
+        return self._cached('address_counts', lambda: np.bincount(self._addresses))
+
+    @property
+    def event_rate(self):
+        """
+        float: Average number of spikes per second, assuming that timestamps are in microseconds. None if the duration of the SpikesFile is zero.
+        """
+        if not self.duration:
+            return None
+        return len(self._timestamps) * 1e6 / self.duration
+
+    @property
+    def address_index(self):
+        """
+        Per-address index of the SpikesFile, built the first time it is used.
+
+        Returns:
+                int[]: Indexes of the spikes sorted by address and, for each address, by timestamp.
+                int[]: Offsets of each address in the previous array. The spikes of address a are in positions offsets[a] to offsets[a + 1].
+                int[]: Timestamps of the spikes in the order given by the first array.
+        """
+        def build():
+            if self.is_sorted:
+                # A stable sort keeps the spikes of each address in time order
+                order = np.argsort(self._addresses, kind='stable')
+            else:
+                order = np.lexsort((self._timestamps, self._addresses))
+            offsets = np.zeros(len(self.address_counts) + 1, dtype=np.int64)
+            np.cumsum(self.address_counts, out=offsets[1:])
+            return order, offsets, self._timestamps[order]
+        return self._cached('address_index', build)
+
+    def channel_timestamps(self, address):
+        """
+        Returns the timestamps of the spikes of an address, in time order.
+
+        Parameters:
+                address (int): Address to get the timestamps of.
+
+        Returns:
+                int[]: Timestamps of the address. It is a view of the address_index, so it should not be modified.
+        """
+        _, offsets, address_timestamps = self.address_index
+        if address < 0 or address >= len(offsets) - 1:
+            return address_timestamps[:0]
+        return address_timestamps[offsets[address]:offsets[address + 1]]
+
+    def channels_indexes(self, addresses, t_start=None, t_end=None):
+        """
+        Returns the indexes of the spikes of a set of addresses whose timestamps are between t_start and t_end (both included).
+
+        Parameters:
+                addresses (int[]): Addresses to get the spikes of.
+                t_start (int, optional): Minimum timestamp. If None, there is no lower limit.
+                t_end (int, optional): Maximum timestamp. If None, there is no upper limit.
+
+        Returns:
+                int[]: Indexes of the spikes, sorted by timestamp (and by their position in the SpikesFile for equal timestamps).
+
+        Note:
+                Only the spikes of the requested addresses are visited, by using the address_index.
+        """
+        order, offsets, address_timestamps = self.address_index
+        selected = []
+        for address in np.unique(np.asarray(addresses, dtype=np.int64)):
+            if address < 0 or address >= len(offsets) - 1:
+                continue
+            start = offsets[address]
+            end = offsets[address + 1]
+            channel = address_timestamps[start:end]
+            a = start + (0 if t_start is None else SpikesFile._searchsorted(channel, t_start, side='left'))
+            b = start + (len(channel) if t_end is None else SpikesFile._searchsorted(channel, t_end, side='right'))
+            selected.append(order[a:b])
+
+        indexes = np.sort(np.concatenate(selected)) if selected else np.zeros(0, dtype=np.int64)
+        if not self.is_sorted:
+            indexes = indexes[np.argsort(self._timestamps[indexes], kind='stable')]
+        return indexes
+
+    def extract_channels(self, addresses, t_start=None, t_end=None):
+        """
+        Returns a new SpikesFile with the spikes of a set of addresses whose timestamps are between t_start and t_end (both included).
+
+        Parameters:
+                addresses (int[]): Addresses to extract.
+                t_start (int, optional): Minimum timestamp. If None, there is no lower limit.
+                t_end (int, optional): Maximum timestamp. If None, there is no upper limit.
+
+        Returns:
+                SpikesFile: SpikesFile with the selected spikes, sorted by timestamp.
+        """
+        indexes = self.channels_indexes(addresses, t_start, t_end)
+        return SpikesFile(self._addresses[indexes], self._timestamps[indexes])
+
+    @staticmethod
+    def _searchsorted(timestamps, timestamp, side='left'):
+        """
+        Same as numpy.searchsorted, but converting timestamp to the dtype of timestamps first, so that the array is not converted to a wider dtype.
+
+        Parameters:
+                timestamps (int[]): Sorted timestamps.
+                timestamp (int or float): Timestamp to search.
+                side (string, optional): 'left' or 'right', as in numpy.searchsorted.
+
+        Returns:
+                int: Insertion position of timestamp.
+        """
+        if timestamps.dtype.kind == 'f':
+            return int(np.searchsorted(timestamps, timestamp, side=side))
+
+        # For integer timestamps, ts >= t is ts >= ceil(t) and ts > t is ts > floor(t)
+        timestamp = math.ceil(timestamp) if side == 'left' else math.floor(timestamp)
+        info = np.iinfo(timestamps.dtype)
+        if timestamp < info.min:
+            return 0
+        if timestamp > info.max:
+            return len(timestamps)
+        return int(np.searchsorted(timestamps, timestamps.dtype.type(timestamp), side=side))
+
+    def time_slice(self, t_start=None, t_end=None, include_end=True):
+        """
+        Returns a new SpikesFile with the spikes whose timestamps are between t_start and t_end.
+
+        Parameters:
+                t_start (int, optional): First timestamp of the slice. If None, the slice starts at the first spike.
+                t_end (int, optional): Last timestamp of the slice. If None, the slice ends at the last spike.
+                include_end (boolean, optional): If set to True, spikes whose timestamp is t_end are included in the slice.
+
+        Returns:
+                SpikesFile: SpikesFile with the spikes of the slice, sorted by timestamp.
+
+        Note:
+                If the timestamps are sorted, the slice is located with a binary search and its arrays are views of the arrays of this SpikesFile, so no data is copied. Use copy() if the slice has to own its data.
+        """
+        if self.is_sorted:
+            a = 0 if t_start is None else SpikesFile._searchsorted(self._timestamps, t_start, side='left')
+            b = len(self._timestamps) if t_end is None else SpikesFile._searchsorted(self._timestamps, t_end, side='right' if include_end else 'left')
+            spikes_slice = self.select(slice(a, b))
+            spikes_slice._stats['is_sorted'] = True
+            return spikes_slice
+
+        mask = np.ones(len(self._timestamps), dtype=bool)
+        if t_start is not None:
+            mask &= self._timestamps >= t_start
+        if t_end is not None:
+            mask &= (self._timestamps <= t_end) if include_end else (self._timestamps < t_end)
+        indexes = np.flatnonzero(mask)
+        return self.select(indexes[np.argsort(self._timestamps[indexes], kind='stable')])
+
+    def select(self, mask):
+        """
+        Returns a new SpikesFile with a subset of the spikes.
+
+        Parameters:
+                mask (bool[], int[] or slice): Boolean mask, indexes or slice of the spikes to select.
+
+        Returns:
+                SpikesFile: SpikesFile with the selected spikes.
+
+        Note:
+                When a slice is used, the arrays of the new SpikesFile are views of the arrays of this SpikesFile.
+        """
+        return SpikesFile(self._addresses[mask], self._timestamps[mask])
+
+    def copy(self):
+        """
+        Returns a copy of the SpikesFile that owns its data.
+
+        Returns:
+                SpikesFile: Copy of the SpikesFile. Memory-mapped arrays are loaded into memory.
+        """
+        return SpikesFile(np.array(self._addresses), np.array(self._timestamps))
+
+    def append(self, address, timestamp):
+        """
+        Adds a spike at the end of the SpikesFile.
+
+        Parameters:
+                address (int): Address of the spike.
+                timestamp (int): Timestamp of the spike.
+
+        Returns:
+                None.
+        """
+        self.extend([address], [timestamp])
+
+    def extend(self, addresses, timestamps):
+        """
+        Adds several spikes at the end of the SpikesFile.
+
+        Parameters:
+                addresses (int[]): Addresses of the spikes.
+                timestamps (int[]): Timestamps of the spikes.
+
+        Returns:
+                None.
+
+        Note:
+                Spikes are written into buffers whose capacity grows geometrically, so adding spikes one by one takes amortized constant time.
+        """
+        self._stats = {}
+        self._addresses, self._addresses_buffer = SpikesFile._extend_buffer(self._addresses, self._addresses_buffer, addresses, np.uint16, np.uint32)
+        self._timestamps, self._timestamps_buffer = SpikesFile._extend_buffer(self._timestamps, self._timestamps_buffer, timestamps, np.uint32, np.uint64)
+
+    @staticmethod
+    def _extend_buffer(values, buffer, new_values, small_dtype, large_dtype):
+        """
+        Appends new_values at the end of values, using buffer (whose first len(values) elements are values) when it has enough capacity.
+
+        Parameters:
+                values (numpy.ndarray): Current values.
+                buffer (numpy.ndarray): Buffer backing values, or None.
+                new_values (int[]): Values to append.
+                small_dtype (numpy.dtype): Same as in _as_compact_array.
+                large_dtype (numpy.dtype): Same as in _as_compact_array.
+
+        Returns:
+                numpy.ndarray: Values after appending new_values.
+                numpy.ndarray: Buffer backing the returned values.
+        """
+        new_values = SpikesFile._as_compact_array(new_values, small_dtype, large_dtype)
+        size = len(values) + len(new_values)
+
+        if not np.can_cast(new_values.dtype, values.dtype, casting='safe'):
+            # The current dtype cannot hold the new values
+            values = SpikesFile._as_compact_array(np.concatenate((values, new_values)), small_dtype, large_dtype)
+            return values, None
+
+        if buffer is None or len(buffer) < size:
+            new_buffer = np.empty(max(2 * size, 1024), dtype=values.dtype)
+            new_buffer[:len(values)] = values
+            buffer = new_buffer
+
+        buffer[len(values):size] = new_values
+        return buffer[:size], buffer
+
+
+def _compact_array_property(name, small_dtype, large_dtype):
+    """
+    Creates a property that stores the assigned values in the attribute name as a compact NumPy array (see SpikesFile._as_compact_array).
+
+    Parameters:
+            name (string): Name of the attribute where the array is stored.
+            small_dtype (numpy.dtype): Unsigned dtype used if it fits all the values.
+            large_dtype (numpy.dtype): Unsigned dtype used otherwise.
+
+    Returns:
+            property: The property.
+    """
+    def getter(self):
+        return getattr(self, name)
+
+    def setter(self, values):
+        setattr(self, name, SpikesFile._as_compact_array(values, small_dtype, large_dtype))
+
+    return property(getter, setter)
 
 
 class LocalizationFile:
@@ -41,8 +460,19 @@ class LocalizationFile:
 
     Note:
             Timestamps, addresses, and neurons' ID are matched, which means that mso_timestamps[0] is the timestamp for the spike with address mso_neuron_ids[0].
+
+            As in SpikesFile, all the attributes are stored as contiguous native-endian NumPy arrays with compact dtypes: uint16 (or uint32 if needed) for neuron IDs and channels and uint32 (or uint64 if needed) for timestamps.
     """
 
+    __slots__ = ('_mso_neuron_ids', '_mso_channels', '_mso_timestamps', '_lso_neuron_ids', '_lso_channels', '_lso_timestamps')
+
+    mso_neuron_ids = _compact_array_property('_mso_neuron_ids', np.uint16, np.uint32)
+    mso_channels = _compact_array_property('_mso_channels', np.uint16, np.uint32)
+    mso_timestamps = _compact_array_property('_mso_timestamps', np.uint32, np.uint64)
+    lso_neuron_ids = _compact_array_property('_lso_neuron_ids', np.uint16, np.uint32)
+    lso_channels = _compact_array_property('_lso_channels', np.uint16, np.uint32)
+    lso_timestamps = _compact_array_property('_lso_timestamps', np.uint32, np.uint64)
+
     def __init__(self, mso_neuron_ids=[], mso_channels=[], mso_timestamps=[], lso_neuron_ids=[], lso_channels=[],
                  lso_timestamps=[]):
         self.mso_neuron_ids = mso_neuron_ids
@@ -50,4 +480,73 @@ class LocalizationFile:
         self.mso_timestamps = mso_timestamps
         self.lso_neuron_ids = lso_neuron_ids
         self.lso_channels = lso_channels
-        self.lso_timestamps = lso_timestamps
\ No newline at end of file
+        self.lso_timestamps = lso_timestamps
+
+
+class AEDATIndex:
+    """
+    Class that contains the summary of an AEDAT file stored in its index file, which allows answering queries about the file without decoding its events.
+
+    Attributes:
+            num_events (int): Number of events of the file.
+            min_ts (int): Smallest timestamp of the file.
+            max_ts (int): Largest timestamp of the file.
+            duration (float): Time (in microseconds) between the smallest and the largest timestamps of the file.
+            address_counts (int[]): Number of events of each address.
+            stride (int): Number of events between two consecutive entries of the sparse table.
+            sparse_timestamps (int[]): Timestamps of the events 0, stride, 2*stride, ... of the file.
+            sparse_offsets (int[]): Byte offsets in the file of the events 0, stride, 2*stride, ... of the file.
+            header_end (int): Number of bytes of the header of the file.
+            file_size (int): Size (in bytes) of the file when the index was built.
+            file_mtime (int): Modification time (in nanoseconds) of the file when the index was built.
+            address_size (int): Number of bytes of each address of the file.
+            timestamp_size (int): Number of bytes of each timestamp of the file.
+
+    Note:
+            Timestamps are unwrapped as in Loaders.loadAEDAT (see Functions.unwrap_timestamps), but ts_tick and reset_timestamp are not applied. Only duration takes ts_tick into account.
+    """
+
+    def __init__(self, num_events=0, min_ts=None, max_ts=None, address_counts=[], stride=1, sparse_timestamps=[],
+                 sparse_offsets=[], header_end=0, file_size=0, file_mtime=0, address_size=2, timestamp_size=4, duration=0):
+        self.num_events = num_events
+        self.min_ts = min_ts
+        self.max_ts = max_ts
+        self.duration = duration
+        self.address_counts = address_counts
+        self.stride = stride
+        self.sparse_timestamps = sparse_timestamps
+        self.sparse_offsets = sparse_offsets
+        self.header_end = header_end
+        self.file_size = file_size
+        self.file_mtime = file_mtime
+        self.address_size = address_size
+        self.timestamp_size = timestamp_size
+
+
+class AEDATInfo:
+    """
+    Class that contains the information about an AEDAT file obtained without reading its events (see Loaders.probe_AEDAT).
+
+    Attributes:
+            num_events (int): Number of events of the file.
+            first_ts (int): Timestamp of the first event of the file.
+            last_ts (int): Timestamp of the last event of the file.
+            duration (float): Time (in microseconds) between the first and the last event of the file.
+            header (string[]): Lines of the ASCII header of the file.
+            version (string): AEDAT version declared in the header of the file, or None if it is not declared.
+            header_end (int): Number of bytes of the header of the file.
+            file_size (int): Size (in bytes) of the file.
+
+    Note:
+            first_ts and last_ts are raw timestamps, as stored in the file, while duration takes ts_tick into account.
+    """
+
+    def __init__(self, num_events=0, first_ts=None, last_ts=None, duration=0, header=[], version=None, header_end=0, file_size=0):
+        self.num_events = num_events
+        self.first_ts = first_ts
+        self.last_ts = last_ts
+        self.duration = duration
+        self.header = header
+        self.version = version
+        self.header_end = header_end
+        self.file_size = file_size
@@ -0,0 +1,360 @@
+#################################################################################
+##                                                                             ##
+##    Copyright C 2018  Juan P. Dominguez-Morales                              ##
+##                                                                             ##
+##    This file is part of pyNAVIS.                                            ##
+##                                                                             ##
+##    pyNAVIS is free software: you can redistribute it and/or modify          ##
+##    it under the terms of the GNU General Public License as published by     ##
+##    the Free Software Foundation, either version 3 of the License, or        ##
+##    (at your option) any later version.                                      ##
+##                                                                             ##
+##    pyNAVIS is distributed in the hope that it will be useful,               ##
+##    but WITHOUT ANY WARRANTY; without even the implied warranty of           ##
+##    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.See the              ##
+##    GNU General Public License for more details.                             ##
+##                                                                             ##
+##    You should have received a copy of the GNU General Public License        ##
+##    along with pyNAVIS.  If not, see <http://www.gnu.org/licenses/>.         ##
+##                                                                             ##
+#################################################################################
+
+import numpy as np
+
+from .functions import Functions
+from .objects import SpikesFile
+
+
+class Pipeline:
+    """
+    Chain of processing stages that is run chunk by chunk over a stream of SpikesFile chunks (e.g. Loaders.iter_AEDAT).
+
+    Stages are declared by calling the methods of the pipeline, which return the pipeline itself, so they can be chained. The last one can be a reducer (collect, histogram or sonogram), which defines the result of run.
+
+    Attributes:
+            settings (MainSettings): Configuration parameters of the input stream.
+            num_addresses (int): Number of addresses of the output of the pipeline. It is updated by stereo_to_mono and phase_lock.
+
+    Note:
+            Example: Pipeline(settings).adapt_timestamps().stereo_to_mono(0).time_window(0, 500000).sonogram().run(Loaders.iter_AEDAT(path, settings))
+
+            Every stage is applied to a chunk before reading the next one, so memory is bounded by the chunk size. Consecutive mask stages (select_addresses, time_window) are fused: their masks are combined and the selected spikes are gathered only once, right before the next stage that needs them.
+
+            The input stream must be sorted by timestamp. Stages that depend on previous chunks (timestamp reset, phase_lock, sonogram) keep their state between chunks, so the result is the same as processing the whole file at once.
+    """
+
+    def __init__(self, settings):
+        self.settings = settings
+        self.num_addresses = settings.num_channels * (settings.on_off_both + 1) * (settings.mono_stereo + 1)
+        self._stages = []
+        self._reducer = None
+
+    def _add_stage(self, kind, function):
+        if self._reducer is not None:
+            raise ValueError("[Pipeline] > ParametersError: no stages can be added after a reducer.")
+        self._stages.append((kind, function))
+        return self
+
+    def offset_addresses(self, offset):
+        """
+        Adds an offset to all the addresses.
+
+        Parameters:
+                offset (int): Offset to add. Can be either negative or positive.
+
+        Returns:
+                Pipeline: The pipeline itself.
+        """
+        def stage(addresses, timestamps, state):
+            return addresses.astype(np.int64) + offset, timestamps
+        self.num_addresses += offset
+        return self._add_stage('map', stage)
+
+    def select_addresses(self, first_address, last_address):
+        """
+        Keeps only the spikes whose addresses are between first_address (included) and last_address (excluded).
+
+        Parameters:
+                first_address (int): First address to keep.
+                last_address (int): First address after the ones to keep.
+
+        Returns:
+                Pipeline: The pipeline itself.
+        """
+        def stage(addresses, timestamps, state):
+            return (addresses >= first_address) & (addresses < last_address)
+        return self._add_stage('mask', stage)
+
+    def time_window(self, t_start, t_end=None, include_end=True):
+        """
+        Keeps only the spikes whose timestamps are between t_start and t_end, as Splitters.manual_splitter does.
+
+        Parameters:
+                t_start (int): First timestamp of the window.
+                t_end (int, optional): Last timestamp of the window. If None, the window ends at the last spike.
+                include_end (boolean, optional): If set to True, spikes whose timestamp is t_end are kept.
+
+        Returns:
+                Pipeline: The pipeline itself.
+
+        Note:
+                Reading stops as soon as a timestamp after t_end is found.
+                If reset_timestamp is set to True in the settings, the first timestamp of the window is subtracted to all the timestamps of the window.
+        """
+        def stage(addresses, timestamps, state):
+            mask = timestamps >= t_start
+            if t_end is not None:
+                mask &= (timestamps <= t_end) if include_end else (timestamps < t_end)
+                if len(timestamps) > 0 and (timestamps[-1] > t_end or (not include_end and timestamps[-1] == t_end)):
+                    state['done'] = True
+            return mask
+        self._add_stage('mask', stage)
+
+        if self.settings.reset_timestamp:
+            def reset(addresses, timestamps, state):
+                if 'first_ts' not in state and len(timestamps) > 0:
+                    state['first_ts'] = timestamps[0]
+                if 'first_ts' in state:
+                    timestamps = timestamps - state['first_ts']
+                return addresses, timestamps
+            self._add_stage('map', reset)
+        return self
+
+    def adapt_timestamps(self):
+        """
+        Adapts the timestamps to the ts_tick of the settings and, if reset_timestamp is set to True, makes them start at 0, as Functions.adapt_timestamps does.
+
+        Returns:
+                Pipeline: The pipeline itself.
+        """
+        def stage(addresses, timestamps, state):
+            if len(timestamps) == 0:
+                return addresses, timestamps
+            if 'offset' not in state:
+                state['offset'] = timestamps[0] if self.settings.reset_timestamp else 0
+            # The output is always a new array, so the input stream is never modified
+            return addresses, Functions._rescale_timestamps(timestamps, state['offset'], self.settings.ts_tick, inplace=False)
+        return self._add_stage('map', stage)
+
+    def stereo_to_mono(self, left_right):
+        """
+        Keeps only the spikes of one of the cochleae of a stereo stream, as Functions.stereo_to_mono does.
+
+        Parameters:
+                left_right (int): Set to 0 to keep the left cochlea, or to 1 to keep the right one.
+
+        Returns:
+                Pipeline: The pipeline itself.
+
+        Raises:
+                ValueError: If the input stream is mono (settings.mono_stereo is set to 0).
+        """
+        if not self.settings.mono_stereo:
+            raise ValueError("[Pipeline.stereo_to_mono] > SettingsError: this functionality cannot be performed over a mono stream.")
+        mono_addresses = self.num_addresses // 2
+        first_address = left_right * mono_addresses
+        self.select_addresses(first_address, first_address + mono_addresses)
+        if first_address:
+            def stage(addresses, timestamps, state):
+                return addresses - addresses.dtype.type(first_address), timestamps
+            self._add_stage('map', stage)
+        self.num_addresses = mono_addresses
+        return self
+
+    def phase_lock(self, posNeg_both=0):
+        """
+        Performs the phase lock operation, as Functions.phase_lock does.
+
+        Parameters:
+                posNeg_both (int, optional): If set to 0, a spike is generated only when spike trains change from ON to OFF addresses. If set to 1, a spike is generated every time spike trains change from ON to OFF addresses or vice versa.
+
+        Returns:
+                Pipeline: The pipeline itself.
+
+        Raises:
+                ValueError: If the on_off_both parameter is not set to 1 (both) in the settings.
+
+        Note:
+                The last polarity of each channel is kept between chunks.
+        """
+        if self.settings.on_off_both != 1:
+            raise ValueError("[Pipeline.phase_lock] > SettingsError: this functionality cannot be applied to streams that do not have ON/positive and OFF/negative addresses. Check the on_off_both setting for more information.")
+
+        def stage(addresses, timestamps, state):
+            channels = addresses // 2
+            polarities = (addresses % 2).astype(np.int8)
+            if 'last_polarity' not in state:
+                state['last_polarity'] = np.full(0, -1, dtype=np.int8)
+            if len(channels) > 0 and channels.max() >= len(state['last_polarity']):
+                last_polarity = np.full(int(channels.max()) + 1, -1, dtype=np.int8)
+                last_polarity[:len(state['last_polarity'])] = state['last_polarity']
+                state['last_polarity'] = last_polarity
+
+            # Group the spikes by channel and compare each polarity with the previous one of the same channel (or of the previous chunks)
+            order = np.argsort(channels, kind='stable')
+            channels_sorted = channels[order]
+            current = polarities[order]
+            previous = np.empty_like(current)
+            first_of_channel = np.ones(len(order), dtype=bool)
+            first_of_channel[1:] = channels_sorted[1:] != channels_sorted[:-1]
+            previous[1:] = current[:-1]
+            previous[first_of_channel] = state['last_polarity'][channels_sorted[first_of_channel]]
+
+            transitions = (previous == 0) & (current == 1)
+            if posNeg_both:
+                transitions |= (previous == 1) & (current == 0)
+
+            # Remember the last polarity of each channel of the chunk
+            last_of_channel = np.ones(len(order), dtype=bool)
+            last_of_channel[:-1] = first_of_channel[1:]
+            state['last_polarity'][channels_sorted[last_of_channel]] = current[last_of_channel]
+
+            indexes = np.sort(order[transitions])
+            return channels[indexes], timestamps[indexes]
+
+        self.num_addresses //= 2
+        return self._add_stage('map', stage)
+
+    def collect(self):
+        """
+        Sets the pipeline to return a SpikesFile with all the processed spikes.
+
+        Returns:
+                Pipeline: The pipeline itself.
+        """
+        def reducer(chunks):
+            addresses = []
+            timestamps = []
+            for chunk_addresses, chunk_timestamps in chunks:
+                addresses.append(chunk_addresses)
+                timestamps.append(chunk_timestamps)
+            if not timestamps:
+                return SpikesFile([], [])
+            return SpikesFile(np.concatenate(addresses), np.concatenate(timestamps))
+        self._reducer = reducer
+        return self
+
+    def histogram(self):
+        """
+        Sets the pipeline to return the number of spikes of each address, as Plots.histogram does (without plotting it).
+
+        Returns:
+                Pipeline: The pipeline itself.
+        """
+        def reducer(chunks):
+            spikes_count = np.zeros(self.num_addresses, dtype=np.int64)
+            for chunk_addresses, _ in chunks:
+                counts = np.bincount(chunk_addresses, minlength=self.num_addresses)
+                if len(counts) > len(spikes_count):
+                    spikes_count = np.pad(spikes_count, (0, len(counts) - len(spikes_count)))
+                spikes_count[:len(counts)] += counts
+            return spikes_count
+        self._reducer = reducer
+        return self
+
+    def sonogram(self):
+        """
+        Sets the pipeline to return the sonogram matrix, as Plots.sonogram does with return_data set to True.
+
+        Returns:
+                Pipeline: The pipeline itself.
+
+        Note:
+                Windows of bin_size microseconds (see MainSettings) start at the first timestamp of the stream. As in Plots.sonogram, both edges of each window are included.
+        """
+        def reducer(chunks):
+            bin_size = self.settings.bin_size
+            sonogram = np.zeros((self.num_addresses, 0))
+            first_ts = None
+            last_ts = None
+            for chunk_addresses, chunk_timestamps in chunks:
+                if len(chunk_timestamps) == 0:
+                    continue
+                if first_ts is None:
+                    first_ts = int(chunk_timestamps[0])
+                last_ts = int(chunk_timestamps[-1])
+
+                in_range = chunk_addresses < self.num_addresses
+                addresses = chunk_addresses[in_range].astype(np.int64)
+                relative_ts = chunk_timestamps[in_range].astype(np.int64) - first_ts
+                windows = np.floor_divide(relative_ts, bin_size).astype(np.int64)
+
+                # Spikes on the edge between two windows belong to both of them
+                on_edge = (relative_ts % bin_size == 0) & (windows > 0)
+                addresses = np.concatenate((addresses, addresses[on_edge]))
+                windows = np.concatenate((windows, windows[on_edge] - 1))
+                if len(windows) == 0:
+                    continue
+
+                first_window = windows.min()
+                num_windows = windows.max() - first_window + 1
+                counts = np.bincount(addresses * num_windows + (windows - first_window), minlength=self.num_addresses * num_windows)
+                if first_window + num_windows > sonogram.shape[1]:
+                    grown = np.zeros((self.num_addresses, max(first_window + num_windows, 2 * sonogram.shape[1])))
+                    grown[:, :sonogram.shape[1]] = sonogram
+                    sonogram = grown
+                sonogram[:, first_window:first_window + num_windows] += counts.reshape(self.num_addresses, num_windows)
+
+            if first_ts is None:
+                return np.zeros((self.num_addresses, 0))
+            return sonogram[:, :int(np.ceil((last_ts - first_ts) / bin_size))]
+        self._reducer = reducer
+        return self
+
+    def chunks(self, source):
+        """
+        Runs the stages of the pipeline over a stream, yielding the processed chunks.
+
+        Parameters:
+                source (iterable or SpikesFile): SpikesFile chunks sorted by timestamp (e.g. Loaders.iter_AEDAT), or a single SpikesFile.
+
+        Returns:
+                generator: (addresses, timestamps) arrays of each processed chunk.
+        """
+        if isinstance(source, SpikesFile):
+            source = [source]
+        states = [{} for _ in self._stages]
+
+        for chunk in source:
+            addresses = np.asarray(chunk.addresses)
+            timestamps = np.asarray(chunk.timestamps)
+            mask = None
+            done = False
+
+            for (kind, function), state in zip(self._stages, states):
+                if kind == 'mask':
+                    # Masks are combined, and spikes are gathered only when needed
+                    stage_mask = function(addresses, timestamps, state)
+                    mask = stage_mask if mask is None else mask & stage_mask
+                else:
+                    if mask is not None:
+                        addresses = addresses[mask]
+                        timestamps = timestamps[mask]
+                        mask = None
+                    addresses, timestamps = function(addresses, timestamps, state)
+                done = done or state.get('done', False)
+
+            if mask is not None:
+                addresses = addresses[mask]
+                timestamps = timestamps[mask]
+
+            yield addresses, timestamps
+            if done:
+                break
+
+    def run(self, source):
+        """
+        Runs the pipeline over a stream.
+
+        Parameters:
+                source (iterable or SpikesFile): SpikesFile chunks sorted by timestamp (e.g. Loaders.iter_AEDAT), or a single SpikesFile.
+
+        Returns:
+                Result of the reducer of the pipeline: a SpikesFile (collect, used if no reducer was set), the histogram array (histogram) or the sonogram matrix (sonogram).
+        """
+        reducer = self._reducer
+        if reducer is None:
+            self.collect()
+            reducer = self._reducer
+            self._reducer = None
+        return reducer(self.chunks(source))
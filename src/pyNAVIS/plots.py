@@ -205,7 +205,7 @@ class Plots:
         This is, a graph where addresses (or cochlea channels) are represented in the X axis, and number of spikes in the Y axis.
 
         Parameters:
-                spikes_file (SpikesFile): File to plot.
+                spikes_file (SpikesFile or AEDATIndex): File to plot, or the index of an AEDAT file (see Loaders.index_AEDAT).
                 settings (MainSettings): Configuration parameters for the file to plot.
                 bar_line (int, optional): Select wether to plot the histogram as bar plot (0) or as a line graph (1).
                 graph_title (string, optional): Text that will appear as title for the graph.
@@ -217,8 +217,10 @@ class Plots:
 
         start_time = time.time()
 
-        spikes_count = np.bincount(spikes_file.addresses,
-                                   minlength=settings.num_channels * (settings.on_off_both + 1) * (settings.mono_stereo + 1))
+        num_addresses = settings.num_channels * (settings.on_off_both + 1) * (settings.mono_stereo + 1)
+        # Per-address counts are already stored in the index, or cached in the SpikesFile
+        spikes_count = np.zeros(max(num_addresses, len(spikes_file.address_counts)), dtype=np.int64)
+        spikes_count[:len(spikes_file.address_counts)] = spikes_file.address_counts
 
         if verbose:
             print('HISTOGRAM CALCULATION:', time.time() - start_time)
@@ -429,6 +431,32 @@ class Plots:
             # print("This functionality is only available for stereo AEDAT files.")
             print("[Plots.difference_between_LR] > SettingsError: This functionality is only available for stereo files.")
 
+    @staticmethod
+    def _mso_activity(localization_file, localization_settings):
+        """
+        Counts the MSO events of each neuron ID of each frequency channel of a LocalizationFile.
+
+        Parameters:
+                localization_file (LocalizationFile): Localization file to use.
+                localization_settings (LocalizationSettings): Localization configuration parameters for the file.
+
+        Returns:
+                int[ , ]: Activity matrix, with one row per frequency channel (starting at mso_start_channel) and one column per neuron ID.
+        """
+        mso_number_freq_ch = localization_settings.mso_end_channel - localization_settings.mso_start_channel + 1
+        num_neurons = localization_settings.mso_num_neurons_channel
+
+        # Move the frequency channels from the relative range to an absolute range starting at zero
+        freq_channels = np.asarray(localization_file.mso_channels).astype(np.int64) - localization_settings.mso_start_channel
+        neuron_ids = np.asarray(localization_file.mso_neuron_ids).astype(np.int64)
+
+        # Events out of range are ignored (see Functions.check_LocalizationFile)
+        valid = (freq_channels >= 0) & (freq_channels < mso_number_freq_ch) & (neuron_ids >= 0) & (neuron_ids < num_neurons)
+
+        # Count every (channel, neuron ID) pair at once
+        mso_activity = np.bincount(freq_channels[valid] * num_neurons + neuron_ids[valid], minlength=mso_number_freq_ch * num_neurons)
+        return mso_activity.reshape(mso_number_freq_ch, num_neurons)
+
     @staticmethod
     def mso_heatmap(localization_file, localization_settings, graph_title="MSO heatmap", enable_colorbar=True,
                     verbose=False):
@@ -459,14 +487,8 @@ class Plots:
         # Create the activity matrix
         mso_activity = np.zeros((mso_number_freq_ch, localization_settings.mso_num_neurons_channel))
 
-        num_mso_events = len(localization_file.mso_timestamps)
-
-        for i in range(0, num_mso_events):
-            # Move the frequency channel from the relative range to an absolute range starting at zero
-            freq_channel = localization_file.mso_channels[i] - localization_settings.mso_start_channel
-            neuron_id = localization_file.mso_neuron_ids[i]
-            # Accumulate the activity for each neuron for each frequency channel according to the LocalizationFIle
-            mso_activity[freq_channel][neuron_id] = mso_activity[freq_channel][neuron_id] + 1
+        # Accumulate the activity for each neuron for each frequency channel according to the LocalizationFile
+        mso_activity += Plots._mso_activity(localization_file, localization_settings)
 
         if verbose == True: print('MSO HEATMAP CALCULATION', time.time() - start_time)
 
@@ -480,7 +502,7 @@ class Plots:
             neuron_id_labels.append(str(i))
 
         # REPRESENTATION
-        plt.style.use('seaborn-ticks')
+        plt.style.use('seaborn-v0_8-ticks')
         htmap_fig, htmap_ax = plt.subplots()
         htmap_fig.canvas.manager.set_window_title(graph_title)
 
@@ -698,14 +720,8 @@ class Plots:
         # Create the activity matrix
         mso_activity = np.zeros((mso_number_freq_ch, localization_settings.mso_num_neurons_channel))
 
-        num_mso_events = len(localization_file.mso_timestamps)
-
         # Calculate the total number of events for each frequency channel and for each neuron ID
-        for i in range(0, num_mso_events):
-            freq_channel = localization_file.mso_channels[i] - localization_settings.mso_start_channel
-            neuron_id = localization_file.mso_neuron_ids[i]
-            # Accumulate the activity for each neuron for each frequency channel according to the LocalizationFIle
-            mso_activity[freq_channel][neuron_id] = mso_activity[freq_channel][neuron_id] + 1
+        mso_activity += Plots._mso_activity(localization_file, localization_settings)
 
         if verbose == True: print('MSO HISTOGRAM CALCULATION:', time.time() - start_time)
 
@@ -21,6 +21,7 @@
 
 import struct
 import time
+import numpy as np
 from .utils import Utils
 
 class Savers:
@@ -162,6 +163,87 @@ class Savers:
             print("TXT file saved correctly. Took:", time.time() - start_time, "seconds")
 
 
+    @staticmethod
+    def _narrowest_dtype(min_value, max_value):
+        """
+        Gets the smallest integer dtype that can store all the values in the range [min_value, max_value].
+
+        Parameters:
+                min_value (int): Smallest value to store.
+                max_value (int): Largest value to store.
+
+        Returns:
+                numpy.dtype: Unsigned dtype if min_value is not negative, signed dtype otherwise.
+        """
+        candidates = [np.uint8, np.uint16, np.uint32, np.uint64] if min_value >= 0 else [np.int8, np.int16, np.int32, np.int64]
+        for dtype in candidates:
+            if np.iinfo(dtype).min <= min_value and max_value <= np.iinfo(dtype).max:
+                return np.dtype(dtype)
+        return np.dtype(candidates[-1])
+
+    @staticmethod
+    def save_NPZ(spikes_file, path, settings, block_events=1048576, verbose = False):
+        """
+        Saves a SpikesFile into a compressed NumPy (.npz) file, the native pyNAVIS format.
+
+        Events are stored in blocks of block_events events. For each block, addresses are stored with the smallest unsigned integer type that fits the number of addresses given by the settings, and timestamps are stored as differences with the previous timestamp (delta encoding). Timestamps with a fractional part (float64) are stored as they are, without delta encoding. Every block is compressed independently, so that blocks can be loaded separately (see Loaders.loadNPZ).
+
+        Parameters:
+                spikes_file (SpikesFile): File to save.
+                path (string): Path where the output file will be saved, including name. Extension should not be specified.
+                settings (MainSettings): Configuration parameters for the file to save. They are stored in the file too.
+                block_events (int, optional): Number of events of each block.
+                verbose (boolean, optional): Set to True if you want the execution time of the function to be printed.
+
+        Returns:
+                None.
+        """
+
+        if verbose == True: start_time = time.time()
+
+        addresses = np.asarray(spikes_file.addresses)
+        timestamps = np.asarray(spikes_file.timestamps)
+        # Fractional timestamps cannot be delta encoded as integers without truncating them
+        float_timestamps = timestamps.dtype.kind == 'f'
+        ts_dtype = np.float64 if float_timestamps else np.int64
+        timestamps = timestamps.astype(ts_dtype)
+        num_addresses = settings.num_channels * (settings.on_off_both + 1) * (settings.mono_stereo + 1)
+        address_dtype = Savers._narrowest_dtype(0, max(num_addresses - 1, int(addresses.max()) if len(addresses) > 0 else 0))
+
+        num_blocks = int(np.ceil(len(timestamps) / float(block_events)))
+        block_min_ts = np.zeros(num_blocks, dtype=ts_dtype)
+        block_max_ts = np.zeros(num_blocks, dtype=ts_dtype)
+        block_first_ts = np.zeros(num_blocks, dtype=ts_dtype)
+
+        arrays = {}
+        for i in range(num_blocks):
+            block_addresses = addresses[i * block_events:(i + 1) * block_events]
+            block_timestamps = timestamps[i * block_events:(i + 1) * block_events]
+
+            block_min_ts[i] = block_timestamps.min()
+            block_max_ts[i] = block_timestamps.max()
+            block_first_ts[i] = block_timestamps[0]
+
+            arrays["addresses_" + str(i)] = block_addresses.astype(address_dtype)
+            if float_timestamps:
+                arrays["timestamps_" + str(i)] = block_timestamps
+            else:
+                # Delta encoding of the timestamps (first delta is 0)
+                deltas = np.diff(block_timestamps, prepend=block_timestamps[0])
+                deltas_dtype = Savers._narrowest_dtype(int(deltas.min()), int(deltas.max()))
+                arrays["timestamps_" + str(i)] = deltas.astype(deltas_dtype)
+
+        np.savez_compressed(path + '.npz', num_blocks=num_blocks, block_min_ts=block_min_ts, block_max_ts=block_max_ts,
+                            block_first_ts=block_first_ts, float_timestamps=float_timestamps, num_channels=settings.num_channels,
+                            mono_stereo=settings.mono_stereo, on_off_both=settings.on_off_both,
+                            address_size=settings.address_size, timestamp_size=settings.timestamp_size,
+                            ts_tick=settings.ts_tick, bin_size=settings.bin_size,
+                            reset_timestamp=settings.reset_timestamp, **arrays)
+
+        if verbose == True:
+            print("NPZ file saved correctly. Took:", time.time() - start_time, "seconds")
+
+
     @staticmethod
     def save_as_any(spikes_file, path, output_format, settings=None):
         """
@@ -170,14 +252,14 @@ class Savers:
         Parameters:
                 spikes_file (SpikesFile): File to save.                
                 path (string): Path where the output file will be saved. Format should not be specified.
-                output_format (string): Output format of the file. Currently supports '.aedat', '.csv', ".txt" and ".txt_rel". See the Savers class for more information.
-                settings (MainSettings, optional): Configuration parameters for the output file. Only needed when saving the output as an AEDAT file.
+                output_format (string): Output format of the file. Currently supports '.aedat', '.csv', ".txt", ".txt_rel" and ".npz". See the Savers class for more information.
+                settings (MainSettings, optional): Configuration parameters for the output file. Only needed when saving the output as an AEDAT or NPZ file.
 
         Returns:
                 None.
 
         Raises:
-                SettingsError: if settings are not specified and output_format refers to AEDAT.
+                SettingsError: if settings are not specified and output_format refers to AEDAT or NPZ.
         """
 
         if output_format in ['aedat', 'AEDAT', 'AEDAT', 'AEDAT', 'Aedat', '.aedat']:
@@ -190,4 +272,9 @@ class Savers:
         elif output_format in ['txt', 'TXT', '.txt']:
             Savers.save_TXT(spikes_file, path)
         elif output_format in ['txt_rel', 'TXT_rel', '.txt_rel']:
-            Savers.save_TXT_relativeTS(spikes_file, path)
\ No newline at end of file
+            Savers.save_TXT_relativeTS(spikes_file, path)
+        elif output_format in ['npz', 'NPZ', '.npz']:
+            if settings != None:
+                Savers.save_NPZ(spikes_file, path, settings)
+            else:
+                print('[Savers.save_as_any] > SettingsError: Settings need to be specified when saving the file as an NPZ file.')
\ No newline at end of file
@@ -20,22 +20,19 @@
 #################################################################################
 
 
-import copy
 # import random
 import numpy as np
 import time
 import os
-from bisect import bisect_left, bisect_right
 
 from .functions import Functions
 from .savers import Savers
-from .utils import Utils
 from .objects import SpikesFile
 
 class Splitters:
 
     @staticmethod
-    def manual_splitter(spikes_file, settings, init, end = -1, return_save_both = 0, output_format = '.aedat', path=None):
+    def manual_splitter(spikes_file, settings, init, end = -1, return_save_both = 0, output_format = '.aedat', path=None, include_end = True):
         """
         Extract a portion of the input SpikesFile file.
 
@@ -47,29 +44,22 @@ class Splitters:
                 return_save_both (int, optional): Set it to 0 to return the resultant SpikesFile, to 1 to save the SpikesFile in the output path, and to 2 to do both.
                 output_format (string, optional): Output format of the file. Currently supports '.aedat', '.csv', ".txt" and ".txt_rel". See the Savers class for more information.
                 path (string, optional): Path where the output file will be saved. Format should not be specified. Not needed if return_save_both is set to 0.
+                include_end (boolean, optional): If set to True, spikes whose timestamp is end are also extracted.
 
         Returns:
                 SpikesFile: SpikesFile containing the extracted portion of the input file. Returned only if return_save_both is either 0 or 2.
-        """
 
-        #THIS IS NOT NEEDED IF TS ARE SORTED
-        aedat_addr_ts = list(zip(spikes_file.addresses, spikes_file.timestamps))
-        aedat_addr_ts = sorted(aedat_addr_ts, key=Utils.getKey)
-        spikes_file_new = copy.deepcopy(spikes_file)
-        spikes_file_new = Utils.extract_addr_and_ts(aedat_addr_ts)
+        Note:
+                If the timestamps of the input file are sorted, the extracted portion shares its data with the input file (see SpikesFile.time_slice).
+        """
 
         if end == -1:
-            end = np.max(spikes_file.timestamps)
-
-        a =  bisect_left(spikes_file_new.timestamps, init)
-        b =  bisect_right(spikes_file_new.timestamps, end)
+            end = spikes_file.max_ts
 
-        spikes_file_new.addresses = spikes_file_new.addresses[a:b]
-        spikes_file_new.timestamps = spikes_file_new.timestamps[a:b]
+        spikes_file_new = spikes_file.time_slice(init, end, include_end=include_end)
 
-        if settings.reset_timestamp == True:
-            minimum_ts = min(spikes_file_new.timestamps)
-            spikes_file_new.timestamps = [(x - minimum_ts) for x in spikes_file_new.timestamps]
+        if settings.reset_timestamp == True and len(spikes_file_new.timestamps) > 0:
+            spikes_file_new.timestamps = spikes_file_new.timestamps - spikes_file_new.min_ts
 
         if return_save_both == 0:
             return spikes_file_new
@@ -118,8 +108,7 @@ class Splitters:
             spikes_processed +=1
 
             if ((current_ts - buffer_ts[0]) <= bin_width * 1000) and (spikes_processed >= noise_threshold):
-                spikes_filtered.addresses.append(current_addr)
-                spikes_filtered.timestamps.append(current_ts) 
+                spikes_filtered.append(current_addr, current_ts)
 
         if verbose == True: print('SEGMENTER_RT CALCULATION', time.time() - start_time)
 
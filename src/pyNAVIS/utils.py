@@ -21,6 +21,8 @@
 
 import time
 
+from .objects import AEDATIndex
+from .objects import AEDATInfo
 from .objects import SpikesFile
 
 
@@ -99,11 +101,18 @@ class Utils:
 		Prints the number of spikes and the number of microseconds of audio that the SpikesFile contains.
 		
 		Parameters:
-				spikes_file (SpikesFile): File to get the information from.
+				spikes_file (SpikesFile, AEDATIndex or AEDATInfo): File to get the information from, the index of an AEDAT file (see Loaders.index_AEDAT) or the information returned by Loaders.probe_AEDAT.
 
 		Returns:
 				None.
+
+		Note:
+				When an AEDATIndex or an AEDATInfo is used, the information is obtained without decoding the events of the file.
 		"""
 
-		print("The file contains", len(spikes_file.addresses), "spikes")
-		print("The audio has", max(spikes_file.timestamps), 'microsec')
\ No newline at end of file
+		if isinstance(spikes_file, (AEDATInfo, AEDATIndex)):
+			print("The file contains", spikes_file.num_events, "spikes")
+			print("The audio has", spikes_file.duration, 'microsec')
+		else:
+			print("The file contains", len(spikes_file.addresses), "spikes")
+			print("The audio has", spikes_file.max_ts, 'microsec')
\ No newline at end of file